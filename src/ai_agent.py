@@ -4,45 +4,235 @@ Handles OpenAI API interactions for various AI tasks.
 """
 import asyncio
 import os
-import json
 import hashlib
-from typing import List, Optional, Dict, Any
+import math
+import operator
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Dict, Any, Tuple
+import openai
+import orjson
 from openai import AsyncOpenAI
 import httpx
 from loguru import logger
 from src.config.settings import (
     OPENAI_API_KEY, 
+    OPENAI_MAX_CONCURRENCY,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_THRESHOLD,
+    EMBEDDING_MODEL,
     MODEL_CONTEXT_LIMITS,
-    DEFAULT_CONTEXT_WINDOW
+    DEFAULT_CONTEXT_WINDOW,
+    MODEL_OUTPUT_LIMITS,
+    DEFAULT_OUTPUT_LIMIT
 )
 from src.config.prompts import (
-    SYSTEM_PROMPTS, SYSTEM_PROMPTS_CONFIG, SUMMARIZE_PROMPT, COMBINE_SUMMARIES_PROMPT, 
+    SYSTEM_PROMPTS, SYSTEM_PROMPTS_CONFIG,
+    SUMMARIZE_PROMPT_STATIC, SUMMARIZE_PROMPT_DYNAMIC,
+    COMBINE_SUMMARIES_PROMPT_STATIC, COMBINE_SUMMARIES_PROMPT_DYNAMIC,
+    SUMMARIZE_CHUNKS_BATCH_PROMPT,
     ERROR_RESPONSE_PROMPT, UNKNOWN_MESSAGE_PROMPT, ACCESS_REQUEST_ADMIN_PROMPT,
     save_custom_prompts
 )
 
+# Message prefixes shared by every request of a kind. Prompt texts are loaded
+# once at import, so these are built once too; static parts come first so the
+# prompt prefix is identical across requests
+_SUMMARIZER_PREFIX = (
+    {"role": "system", "content": SYSTEM_PROMPTS["summarizer"]},
+    {"role": "user", "content": SUMMARIZE_PROMPT_STATIC},
+)
+_COMBINE_PREFIX = (
+    {"role": "system", "content": SYSTEM_PROMPTS["summarizer"]},
+    {"role": "user", "content": COMBINE_SUMMARIES_PROMPT_STATIC},
+)
+_ERROR_HANDLER_SYSTEM = {"role": "system", "content": SYSTEM_PROMPTS["error_handler"]}
+_ADMIN_ASSISTANT_SYSTEM = {"role": "system", "content": SYSTEM_PROMPTS["admin_assistant"]}
+
+# Sampling settings for the short conversational replies
+_SHORT_REPLY_PARAMS = {"temperature": 0.7, "max_tokens": 150}
+
+UNKNOWN_MESSAGE_FALLBACK = "Бот работает только с ссылками на YouTube видео. Пожалуйста, отправьте ссылку на YouTube видео."
+
+# Errors worth retrying: 429s, network problems, timeouts and server-side 5xx
+RETRYABLE_OPENAI_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError
+)
+CHAT_MAX_TRIES = 6
+CHAT_MAX_BACKOFF = 60  # seconds
+
+# Response cache location (directory is created once, at import)
+CACHE_DB_PATH = os.path.join("data", "cache.db")
+os.makedirs(os.path.dirname(CACHE_DB_PATH), exist_ok=True)
+
+# Only the start of a transcript is embedded; it is enough to recognise near-duplicates
+EMBEDDING_INPUT_CHARS = 8000
+
+# Replies kept per (kind, model, normalized text) for off-topic messages and error
+# explanations; once a pool is full, repeats are answered from it without OpenAI
+REPLY_POOL_SIZE = 5
+REPLY_KEY_CHARS = 64
+# Bounds: pools kept in memory (LRU) and pooled replies kept on disk (oldest dropped first)
+REPLY_POOL_MEMORY_KEYS = 1024
+REPLY_POOL_MAX_ROWS = 20000
+
+# The model list changes over weeks, not per message
+MODELS_CACHE_TTL = 3600  # seconds
+
+# Model prefixes sorted longest first, so the first match is the most specific one
+# (e.g. "gpt-4.1-nano" is checked before "gpt-4")
+_MODEL_PREFIXES = sorted(
+    ((prefix.lower(), limit) for prefix, limit in MODEL_CONTEXT_LIMITS.items()),
+    key=lambda item: -len(item[0])
+)
+_OUTPUT_PREFIXES = sorted(
+    ((prefix.lower(), limit) for prefix, limit in MODEL_OUTPUT_LIMITS.items()),
+    key=lambda item: -len(item[0])
+)
+
+# Rough size of a token in characters, for estimating request sizes
+CHARS_PER_TOKEN = 4
+# Completion budget requested per chunk in a batched summary
+BATCH_TOKENS_PER_CHUNK = 1000
+
+@lru_cache(maxsize=64)
+def _context_limit_for(model: str) -> int:
+    """
+    Look up the context window for a model by its longest matching prefix.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        int: Context window size in tokens
+    """
+    model = model.lower()
+    for prefix, limit in _MODEL_PREFIXES:
+        if model.startswith(prefix):
+            return limit
+    
+    logger.warning(f"No context limit found for model {model}, using default {DEFAULT_CONTEXT_WINDOW}")
+    return DEFAULT_CONTEXT_WINDOW
+
+@lru_cache(maxsize=64)
+def _output_limit_for(model: str) -> int:
+    """
+    Look up the maximum completion size for a model by its longest matching prefix.
+    
+    Args:
+        model: Model name
+        
+    Returns:
+        int: Maximum completion size in tokens
+    """
+    model = model.lower()
+    for prefix, limit in _OUTPUT_PREFIXES:
+        if model.startswith(prefix):
+            return limit
+    
+    return DEFAULT_OUTPUT_LIMIT
+
+@lru_cache(maxsize=16)
+def _default_model(prompt_type: str) -> str:
+    """
+    Look up the configured default model for a prompt type.
+    Cleared by AIAgent.update_prompt_model when the configuration changes.
+    
+    Args:
+        prompt_type: Type of prompt (summarizer, error_handler, etc.)
+        
+    Returns:
+        str: Default model for the prompt type
+    """
+    return SYSTEM_PROMPTS_CONFIG.get(prompt_type, {}).get("model", "gpt-4.1-nano")
+
 class AIAgent:
     """
     AI Agent that handles OpenAI API interactions.
     Provides methods for different AI tasks like summarization, error handling, etc.
     """
-    def __init__(self):
+    # Connection pool shared by every AIAgent in the process (the bot and the
+    # summarizer each hold one), created on first use
+    _shared_http: Optional[httpx.AsyncClient] = None
+    
+    def __init__(self, max_concurrency: int = OPENAI_MAX_CONCURRENCY):
         """
         Initializes the AI Agent with OpenAI client.
+        
+        Args:
+            max_concurrency: Maximum number of chunk requests sent to OpenAI at once
         """
-        # Create a clean httpx client with no proxy settings
-        http_client = httpx.AsyncClient()
+        self.max_concurrency = max_concurrency
+        self.cache_path = CACHE_DB_PATH
         
-        # Initialize the OpenAI client with our custom http_client
-        self.client = AsyncOpenAI(
+        # In-process LRU in front of the SQLite cache
+        self._mem_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._mem_max = 512
+        # Serializes use of the shared SQLite connection from worker threads
+        self._db_lock = threading.Lock()
+        # Semantic cache index, loaded from the database on first lookup
+        self._embeddings: Optional[Dict[str, List[Tuple[str, array]]]] = None
+        # Bounded LRU of reply pools; each is loaded from the database on first use
+        self._reply_pool: "OrderedDict[Tuple[str, str, str], List[str]]" = OrderedDict()
+        # (fetched at, model IDs) from the last successful models.list call
+        self._models: Optional[Tuple[float, List[str]]] = None
+        logger.info("AI Agent initialized with OpenAI client and caching")
+    
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        """
+        Clean pooled httpx client with no proxy settings, shared by the
+        OpenAI clients and our direct API calls across all instances.
+        """
+        if AIAgent._shared_http is None or AIAgent._shared_http.is_closed:
+            AIAgent._shared_http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+                timeout=60
+            )
+        return AIAgent._shared_http
+    
+    @cached_property
+    def client(self) -> AsyncOpenAI:
+        """OpenAI client using our custom http_client. Created on first use."""
+        return AsyncOpenAI(
             api_key=OPENAI_API_KEY,
-            http_client=http_client
+            http_client=self._http,
+            max_retries=2
         )
-        
-        # Initialize cache
-        self.cache_dir = os.path.join("data", "cache")
-        os.makedirs(self.cache_dir, exist_ok=True)
-        logger.info("AI Agent initialized with OpenAI client and caching")
+    
+    @cached_property
+    def _chat_client(self) -> AsyncOpenAI:
+        """Client for _chat, which does its own retries; SDK retries are off so they do not multiply."""
+        return self.client.with_options(max_retries=0)
+    
+    @cached_property
+    def _models_lock(self) -> asyncio.Lock:
+        """Lets concurrent list_models callers share one request. Created on first use, inside the loop."""
+        return asyncio.Lock()
+    
+    @cached_property
+    def db(self) -> sqlite3.Connection:
+        """
+        Response cache: a single SQLite key-value store instead of a file per key.
+        Opened on first use.
+        """
+        db = sqlite3.connect(self.cache_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT, vector BLOB)")
+        db.execute("CREATE TABLE IF NOT EXISTS reply_pool (kind TEXT, model TEXT, text TEXT, response TEXT)")
+        db.execute("CREATE INDEX IF NOT EXISTS reply_pool_key ON reply_pool (kind, model, text)")
+        db.commit()
+        return db
     
     def _generate_cache_key(self, text: str, title: str, model: str) -> str:
         """
@@ -54,13 +244,62 @@ class AIAgent:
             model: OpenAI model used
             
         Returns:
-            str: Cache key (MD5 hash)
+            str: Cache key (128-bit BLAKE2b hex digest)
+        """
+        # Feed the parts to the hasher one by one instead of building
+        # a concatenated copy of the whole transcript first
+        h = hashlib.blake2b(digest_size=16)
+        h.update(text.encode())
+        h.update(b"|")
+        h.update(title.encode())
+        h.update(b"|")
+        h.update(model.encode())
+        return h.hexdigest()
+    
+    def _video_cache_key(self, video_id: str, model: str, languages: List[str]) -> str:
+        """
+        Generate a cache key for the summary of a video. The video, model and
+        transcript language preference fully determine the summary.
+        
+        Args:
+            video_id: YouTube video ID
+            model: OpenAI model used
+            languages: Transcript languages in order of preference
+            
+        Returns:
+            str: Cache key (128-bit BLAKE2b hex digest)
         """
-        # Create a unique identifier based on text, title and model
-        content = f"{text}|{title}|{model}"
-        return hashlib.md5(content.encode()).hexdigest()
+        key = f"video|{video_id}|{model}|{','.join(languages)}"
+        return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
     
-    def _get_cached_response(self, cache_key: str) -> Optional[str]:
+    async def get_video_summary(self, video_id: str, model: str, languages: List[str]) -> Optional[str]:
+        """
+        Look up a cached summary of a video, so it can be answered without
+        fetching the transcript or calling OpenAI.
+        
+        Args:
+            video_id: YouTube video ID
+            model: OpenAI model used
+            languages: Transcript languages in order of preference
+            
+        Returns:
+            Optional[str]: Cached summary or None if not found
+        """
+        return await self._get_cached_response(self._video_cache_key(video_id, model, languages))
+    
+    async def cache_video_summary(self, video_id: str, model: str, languages: List[str], summary: str) -> None:
+        """
+        Cache the summary of a video.
+        
+        Args:
+            video_id: YouTube video ID
+            model: OpenAI model used
+            languages: Transcript languages in order of preference
+            summary: Summary to cache
+        """
+        await self._cache_response(self._video_cache_key(video_id, model, languages), summary)
+    
+    async def _get_cached_response(self, cache_key: str) -> Optional[str]:
         """
         Try to get a cached response.
         
@@ -70,18 +309,56 @@ class AIAgent:
         Returns:
             Optional[str]: Cached response or None if not found
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    logger.info(f"Cache hit for key {cache_key}")
-                    return data.get('response')
-            except Exception as e:
-                logger.error(f"Error reading cache: {e}")
+        # Check memory first
+        cached = self._mem_cache.get(cache_key)
+        if cached is not None:
+            self._mem_cache.move_to_end(cache_key)
+            logger.info(f"Memory cache hit for key {cache_key}")
+            return cached
+        
+        # Disk lookup runs in a worker thread so it never blocks the event loop
+        try:
+            row = await asyncio.to_thread(self._read_cache_row, cache_key)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading cache: {e}")
+            return None
+        
+        if row:
+            logger.info(f"Cache hit for key {cache_key}")
+            self._remember(cache_key, row[0])
+            return row[0]
         return None
     
-    def _cache_response(self, cache_key: str, response: str) -> None:
+    def _remember(self, cache_key: str, response: str) -> None:
+        """
+        Put a response into the in-memory LRU, evicting the oldest entry when full.
+        
+        Args:
+            cache_key: Cache key to store under
+            response: Response to keep in memory
+        """
+        self._mem_cache[cache_key] = response
+        self._mem_cache.move_to_end(cache_key)
+        if len(self._mem_cache) > self._mem_max:
+            self._mem_cache.popitem(last=False)
+    
+    def _read_cache_row(self, cache_key: str) -> Optional[tuple]:
+        """Blocking SQLite read; called via asyncio.to_thread."""
+        with self._db_lock:
+            return self.db.execute(
+                "SELECT response FROM cache WHERE key = ?", (cache_key,)
+            ).fetchone()
+    
+    def _write_cache_row(self, cache_key: str, response: str) -> None:
+        """Blocking SQLite write; called via asyncio.to_thread."""
+        with self._db_lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO cache (key, response) VALUES (?, ?)",
+                (cache_key, response)
+            )
+            self.db.commit()
+    
+    async def _cache_response(self, cache_key: str, response: str) -> None:
         """
         Cache a response for future use.
         
@@ -89,14 +366,270 @@ class AIAgent:
             cache_key: Cache key to store under
             response: Response to cache
         """
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        self._remember(cache_key, response)
         try:
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump({'response': response}, f, ensure_ascii=False, indent=2)
+            await asyncio.to_thread(self._write_cache_row, cache_key, response)
             logger.info(f"Cached response for key {cache_key}")
-        except Exception as e:
+        except sqlite3.Error as e:
             logger.error(f"Error writing cache: {e}")
     
+    def _load_embeddings(self) -> Dict[str, List[Tuple[str, array]]]:
+        """Blocking load of all stored embeddings, grouped by summarization model."""
+        index: Dict[str, List[Tuple[str, array]]] = {}
+        with self._db_lock:
+            rows = self.db.execute("SELECT key, model, vector FROM embeddings").fetchall()
+        for key, model, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            index.setdefault(model, []).append((key, vector))
+        logger.info(f"Loaded {len(rows)} embeddings for the semantic cache")
+        return index
+    
+    def _write_embedding_row(self, cache_key: str, model: str, vector: array) -> None:
+        """Blocking SQLite write of an embedding; called via asyncio.to_thread."""
+        with self._db_lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)",
+                (cache_key, model, vector.tobytes())
+            )
+            self.db.commit()
+    
+    @staticmethod
+    def _best_match(vector: array, candidates: List[Tuple[str, array]]) -> Tuple[Optional[str], float]:
+        """
+        Find the stored embedding closest to the given one.
+        
+        Args:
+            vector: L2-normalized query embedding
+            candidates: (cache key, L2-normalized embedding) pairs
+            
+        Returns:
+            Tuple[Optional[str], float]: Best cache key and its cosine similarity
+        """
+        best_key, best_score = None, -1.0
+        for key, candidate in candidates:
+            score = sum(map(operator.mul, vector, candidate))
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+    
+    async def _embed(self, text: str, title: str) -> Optional[array]:
+        """
+        Embed the start of a text for the semantic cache.
+        
+        Args:
+            text: Input text
+            title: Content title
+            
+        Returns:
+            Optional[array]: L2-normalized embedding, or None if the call failed
+        """
+        try:
+            response = await self.client.embeddings.create(
+                model=EMBEDDING_MODEL,
+                input=f"{title}\n{text[:EMBEDDING_INPUT_CHARS]}"
+            )
+        except openai.APIError as e:
+            logger.warning(f"Embedding request failed, skipping semantic cache: {e}")
+            return None
+        
+        values = response.data[0].embedding
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return array("f", (v / norm for v in values))
+    
+    async def _semantic_lookup(self, text: str, title: str, model: str) -> Tuple[Optional[str], Optional[array]]:
+        """
+        Look for a cached response whose input is semantically near-identical.
+        
+        Args:
+            text: Input text
+            title: Content title
+            model: OpenAI model used
+            
+        Returns:
+            Tuple[Optional[str], Optional[array]]: Cached response (or None) and the
+            query embedding, so a fresh response can be indexed without re-embedding
+        """
+        if self._embeddings is None:
+            self._embeddings = await asyncio.to_thread(self._load_embeddings)
+        
+        vector = await self._embed(text, title)
+        if vector is None:
+            return None, None
+        
+        candidates = self._embeddings.get(model)
+        if not candidates:
+            return None, vector
+        
+        key, score = await asyncio.to_thread(self._best_match, vector, list(candidates))
+        if key is None or score < SEMANTIC_CACHE_THRESHOLD:
+            return None, vector
+        
+        response = await self._get_cached_response(key)
+        if response:
+            logger.info(f"Semantic cache hit for {title} (similarity {score:.3f})")
+        return response, vector
+    
+    async def _index_embedding(self, cache_key: str, model: str, vector: array) -> None:
+        """
+        Add an embedding to the semantic cache index and persist it.
+        
+        Args:
+            cache_key: Exact-match cache key of the response
+            model: OpenAI model used
+            vector: L2-normalized embedding of the input
+        """
+        if self._embeddings is None:
+            return
+        self._embeddings.setdefault(model, []).append((cache_key, vector))
+        try:
+            await asyncio.to_thread(self._write_embedding_row, cache_key, model, vector)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing embedding: {e}")
+    
+    def _load_reply_pool(self, key: Tuple[str, str, str]) -> List[str]:
+        """Blocking load of the newest pooled replies for one (kind, model, text) key."""
+        with self._db_lock:
+            rows = self.db.execute(
+                "SELECT response FROM reply_pool WHERE kind = ? AND model = ? AND text = ? "
+                "ORDER BY rowid DESC LIMIT ?",
+                (*key, REPLY_POOL_SIZE)
+            ).fetchall()
+        return [response for (response,) in rows]
+    
+    def _write_reply_row(self, key: Tuple[str, str, str], response: str) -> None:
+        """
+        Blocking SQLite write of a pooled reply; called via asyncio.to_thread.
+        Drops the oldest rows so the table keeps at most REPLY_POOL_MAX_ROWS.
+        """
+        with self._db_lock:
+            cursor = self.db.execute(
+                "INSERT INTO reply_pool (kind, model, text, response) VALUES (?, ?, ?, ?)",
+                (*key, response)
+            )
+            # Rowids only grow (rows are deleted from the low end), so this keeps the newest rows
+            self.db.execute("DELETE FROM reply_pool WHERE rowid <= ?", (cursor.lastrowid - REPLY_POOL_MAX_ROWS,))
+            self.db.commit()
+    
+    async def _pooled_reply(self, kind: str, model: str, text: str,
+                            generate: Callable[[], Awaitable[str]]) -> str:
+        """
+        Answer from a pool of earlier replies to the same input, generating
+        new ones until the pool holds REPLY_POOL_SIZE entries.
+        
+        Args:
+            kind: Reply type (e.g. "unknown_message")
+            model: OpenAI model used
+            text: Input the reply depends on
+            generate: Coroutine factory producing a fresh reply
+            
+        Returns:
+            str: Pooled or freshly generated reply
+        """
+        key, pool = await self._get_reply_pool(kind, model, text)
+        if len(pool) >= REPLY_POOL_SIZE:
+            logger.info(f"Reply pool hit for {kind}")
+            return random.choice(pool)
+        
+        reply = await generate()
+        await self._add_pooled_reply(key, pool, reply)
+        return reply
+    
+    async def _get_reply_pool(self, kind: str, model: str, text: str) -> Tuple[Tuple[str, str, str], List[str]]:
+        """
+        Get the reply pool for an input, loading it from the database on first use.
+        
+        Returns:
+            Tuple[Tuple[str, str, str], List[str]]: Pool key and its (mutable) list of replies
+        """
+        key = (kind, model, " ".join(text.lower().split())[:REPLY_KEY_CHARS])
+        pool = self._reply_pool.get(key)
+        if pool is None:
+            loaded = await asyncio.to_thread(self._load_reply_pool, key)
+            # Another caller may have loaded the same pool meanwhile
+            pool = self._reply_pool.setdefault(key, loaded)
+            if len(self._reply_pool) > REPLY_POOL_MEMORY_KEYS:
+                self._reply_pool.popitem(last=False)
+        else:
+            self._reply_pool.move_to_end(key)
+        return key, pool
+    
+    async def _add_pooled_reply(self, key: Tuple[str, str, str], pool: List[str], reply: str) -> None:
+        """Add a fresh reply to its pool, unless concurrent requests already filled it, and persist it."""
+        if len(pool) >= REPLY_POOL_SIZE:
+            return
+        pool.append(reply)
+        try:
+            await asyncio.to_thread(self._write_reply_row, key, reply)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing reply pool: {e}")
+    
+    async def _chat(self, **kwargs: Any) -> str:
+        """
+        Call the chat completions API, retrying transient failures
+        (rate limits, connection errors, timeouts, 5xx) with exponential
+        backoff and full jitter.
+        
+        Args:
+            **kwargs: Arguments for client.chat.completions.create
+            
+        Returns:
+            str: Content of the first choice, stripped
+        """
+        for attempt in range(1, CHAT_MAX_TRIES + 1):
+            try:
+                response = await self._chat_client.chat.completions.create(**kwargs)
+                return response.choices[0].message.content.strip()
+            except RETRYABLE_OPENAI_ERRORS as e:
+                if attempt == CHAT_MAX_TRIES:
+                    raise
+                await self._chat_backoff(attempt, e)
+    
+    async def _chat_stream(self, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream a chat completion with the same retries as _chat. Failures are
+        retried only until the first piece is yielded; after that the caller
+        has already shown part of the reply, so they propagate.
+        
+        Args:
+            **kwargs: Arguments for client.chat.completions.create (without stream)
+            
+        Yields:
+            str: Pieces of the content of the first choice in order
+        """
+        for attempt in range(1, CHAT_MAX_TRIES + 1):
+            started = False
+            try:
+                stream = await self._chat_client.chat.completions.create(stream=True, **kwargs)
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        started = True
+                        yield delta
+                return
+            except RETRYABLE_OPENAI_ERRORS as e:
+                if started or attempt == CHAT_MAX_TRIES:
+                    raise
+                await self._chat_backoff(attempt, e)
+    
+    @staticmethod
+    async def _chat_backoff(attempt: int, error: Exception) -> None:
+        """
+        Sleep before retrying a failed chat request (exponential backoff, full jitter).
+        
+        Args:
+            attempt: Number of the attempt that failed, starting at 1
+            error: The error it failed with
+        """
+        delay = random.uniform(0, min(CHAT_MAX_BACKOFF, 2 ** attempt))
+        logger.warning(
+            f"OpenAI request failed ({type(error).__name__}), "
+            f"retry {attempt}/{CHAT_MAX_TRIES - 1} in {delay:.1f}s"
+        )
+        await asyncio.sleep(delay)
+    
     def get_model_context_limit(self, model: str) -> int:
         """
         Get the context window limit for a specific model.
@@ -105,28 +638,39 @@ class AIAgent:
             model: Model name
             
         Returns:
-            int: Context window size in characters
+            int: Context window size in tokens
+        """
+        return _context_limit_for(model)
+    
+    def _fresh_models(self) -> Optional[List[str]]:
+        """Cached model list, or None if there is none or it is older than MODELS_CACHE_TTL."""
+        if self._models and time.monotonic() - self._models[0] < MODELS_CACHE_TTL:
+            return self._models[1]
+        return None
+    
+    async def list_models(self) -> List[str]:
         """
-        # Exact match for gpt-4.1-nano to ensure it doesn't match with gpt-4
-        if "gpt-4.1-nano" in model.lower():
-            return MODEL_CONTEXT_LIMITS["gpt-4.1-nano"]
+        List available OpenAI models. The list is cached for MODELS_CACHE_TTL
+        seconds, and concurrent callers share a single request.
         
-        # Check other models
-        for model_key, context_limit in MODEL_CONTEXT_LIMITS.items():
-            # Skip gpt-4.1-nano since we already checked it
-            if model_key == "gpt-4.1-nano":
-                continue
-                
-            if model.lower().startswith(model_key.lower()):
-                return context_limit
+        Returns:
+            List[str]: List of model IDs (shared, do not mutate)
+        """
+        models = self._fresh_models()
+        if models is not None:
+            return models
         
-        # Return default if model not found
-        logger.warning(f"No context limit found for model {model}, using default {DEFAULT_CONTEXT_WINDOW}")
-        return DEFAULT_CONTEXT_WINDOW
+        async with self._models_lock:
+            # Another caller may have fetched the list while we waited
+            models = self._fresh_models()
+            if models is not None:
+                return models
+            return await self._fetch_models()
     
-    async def list_models(self) -> List[str]:
+    async def _fetch_models(self) -> List[str]:
         """
-        List available OpenAI models.
+        Fetch the GPT models from the OpenAI API, falling back to a static
+        list (which is not cached) if the request fails.
         
         Returns:
             List[str]: List of model IDs
@@ -136,6 +680,7 @@ class AIAgent:
             # Filter to only GPT models
             gpt_models = [model.id for model in models.data if 'gpt' in model.id.lower()]
             logger.info(f"Retrieved {len(gpt_models)} GPT models from OpenAI API")
+            self._models = (time.monotonic(), gpt_models)
             return gpt_models
         except Exception as e:
             logger.error(f"Failed to list models: {str(e)}")
@@ -162,11 +707,7 @@ class AIAgent:
         Returns:
             str: Default model for the prompt type
         """
-        try:
-            return SYSTEM_PROMPTS_CONFIG.get(prompt_type, {}).get("model", "gpt-4.1-nano")
-        except Exception as e:
-            logger.error(f"Error getting default model for {prompt_type}: {e}")
-            return "gpt-4.1-nano"
+        return _default_model(prompt_type)
     
     async def update_prompt_model(self, prompt_type: str, model: str) -> bool:
         """
@@ -182,7 +723,9 @@ class AIAgent:
         try:
             if prompt_type in SYSTEM_PROMPTS_CONFIG:
                 SYSTEM_PROMPTS_CONFIG[prompt_type]["model"] = model
-                save_custom_prompts(SYSTEM_PROMPTS_CONFIG)
+                _default_model.cache_clear()
+                # Persist in a worker thread; the prompts file write is blocking
+                await asyncio.to_thread(save_custom_prompts, SYSTEM_PROMPTS_CONFIG)
                 logger.info(f"Updated default model for {prompt_type} to {model}")
                 return True
             else:
@@ -192,6 +735,22 @@ class AIAgent:
             logger.error(f"Error updating prompt model: {e}")
             return False
     
+    def _build_summarize_messages(self, text: str, title: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a summarization request.
+        
+        Args:
+            text: Text to summarize
+            title: Title of the content
+            
+        Returns:
+            List[Dict[str, str]]: Messages for the chat completions API
+        """
+        return [
+            *_SUMMARIZER_PREFIX,
+            {"role": "user", "content": SUMMARIZE_PROMPT_DYNAMIC.format(title=title, text=text)}
+        ]
+    
     async def summarize_text(self, text: str, title: str, model: str = None) -> str:
         """
         Summarize text using OpenAI API.
@@ -212,37 +771,181 @@ class AIAgent:
         cache_key = self._generate_cache_key(text, title, model)
         
         # Try to get from cache first
-        cached_response = self._get_cached_response(cache_key)
+        cached_response = await self._get_cached_response(cache_key)
         if cached_response:
             logger.info(f"Returning cached summary response for {title}")
             return cached_response
         
-        try:
-            logger.info(f"Summarizing text with length {len(text)} using model {model}")
+        # Fall back to a near-duplicate input (whitespace changes, corrected words)
+        embedding = None
+        if SEMANTIC_CACHE_ENABLED:
+            cached_response, embedding = await self._semantic_lookup(text, title, model)
+            if cached_response:
+                return cached_response
+        
+        logger.info(f"Summarizing text with length {len(text)} using model {model}")
+        
+        # Get appropriate token limit based on model
+        max_tokens = 1000
+        
+        summary = await self._chat(
+            model=model,
+            messages=self._build_summarize_messages(text, title),
+            temperature=0.5,
+            max_tokens=max_tokens
+        )
+        logger.info(f"Generated summary with length {len(summary)}")
+        
+        # Cache the response
+        await self._cache_response(cache_key, summary)
+        if embedding is not None:
+            await self._index_embedding(cache_key, model, embedding)
+        
+        return summary
+    
+    async def summarize_text_stream(self, text: str, title: str, model: str = None) -> AsyncIterator[str]:
+        """
+        Summarize text using OpenAI API, yielding the summary as it is generated.
+        The complete summary is cached once the stream finishes.
+        
+        Args:
+            text: Text to summarize
+            title: Title of the content
+            model: OpenAI model to use (optional, uses default if None)
             
-            # Get appropriate token limit based on model
-            max_tokens = 1000
+        Yields:
+            str: Pieces of the summary in order (a single piece on cache hit)
+        """
+        # Use default model if none provided
+        if model is None:
+            model = self.get_default_model("summarizer")
+        
+        cache_key = self._generate_cache_key(text, title, model)
+        
+        cached_response = await self._get_cached_response(cache_key)
+        if cached_response:
+            logger.info(f"Returning cached summary response for {title}")
+            yield cached_response
+            return
+        
+        # Fall back to a near-duplicate input (whitespace changes, corrected words)
+        embedding = None
+        if SEMANTIC_CACHE_ENABLED:
+            cached_response, embedding = await self._semantic_lookup(text, title, model)
+            if cached_response:
+                yield cached_response
+                return
+        
+        logger.info(f"Streaming summary of text with length {len(text)} using model {model}")
+        
+        parts = []
+        async for delta in self._chat_stream(
+            model=model,
+            messages=self._build_summarize_messages(text, title),
+            temperature=0.5,
+            max_tokens=1000
+        ):
+            parts.append(delta)
+            yield delta
+        
+        summary = "".join(parts).strip()
+        logger.info(f"Generated streamed summary with length {len(summary)}")
+        await self._cache_response(cache_key, summary)
+        if embedding is not None:
+            await self._index_embedding(cache_key, model, embedding)
+    
+    async def summarize_chunks(self, chunks: List[str], title: str, model: str = None,
+                               return_exceptions: bool = False) -> List[Any]:
+        """
+        Summarize several chunks concurrently, bounded by max_concurrency.
+        
+        Args:
+            chunks: Text chunks to summarize
+            title: Title of the content
+            model: OpenAI model to use (optional, uses default if None)
+            return_exceptions: Return failures in place of summaries instead of raising
+            
+        Returns:
+            List[Any]: Summaries in the same order as chunks (or exceptions if requested)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def summarize_one(chunk: str) -> str:
+            async with semaphore:
+                return await self.summarize_text(chunk, title, model)
+        
+        logger.info(f"Summarizing {len(chunks)} chunks with concurrency {self.max_concurrency}")
+        return await asyncio.gather(
+            *(summarize_one(chunk) for chunk in chunks),
+            return_exceptions=return_exceptions
+        )
+    
+    async def summarize_chunks_batched(self, chunks: List[str], title: str, model: str = None,
+                                       return_exceptions: bool = False) -> List[Any]:
+        """
+        Summarize several chunks with a single request that returns a JSON array.
+        Trades N requests for one, which helps when limited by requests per minute.
+        Falls back to summarize_chunks if the request does not fit the model context
+        or the response cannot be parsed.
+        
+        Args:
+            chunks: Text chunks to summarize
+            title: Title of the content
+            model: OpenAI model to use (optional, uses default if None)
+            return_exceptions: Passed to summarize_chunks when falling back
             
-            response = await self.client.chat.completions.create(
+        Returns:
+            List[Any]: Summaries in the same order as chunks (or exceptions if requested)
+        """
+        # Use default model if none provided
+        if model is None:
+            model = self.get_default_model("summarizer")
+        
+        separator = "\n\n###CHUNK###\n\n"
+        prompt = SUMMARIZE_CHUNKS_BATCH_PROMPT.format(
+            title=title,
+            count=len(chunks),
+            chunks=separator.join(chunks)
+        )
+        max_tokens = min(BATCH_TOKENS_PER_CHUNK * len(chunks), _output_limit_for(model))
+        
+        # The context limit is in tokens and covers the prompt and the completion
+        input_chars = len(prompt) + sum(len(message["content"]) for message in _SUMMARIZER_PREFIX)
+        if math.ceil(input_chars / CHARS_PER_TOKEN) + max_tokens > self.get_model_context_limit(model):
+            logger.info(f"Chunks for {title} exceed the context of {model}, summarizing separately")
+            return await self.summarize_chunks(chunks, title, model, return_exceptions=return_exceptions)
+        
+        logger.info(f"Summarizing {len(chunks)} chunks in one request using model {model}")
+        
+        try:
+            content = await self._chat(
                 model=model,
                 messages=[
-                    {"role": "system", "content": SYSTEM_PROMPTS["summarizer"]},
-                    {"role": "user", "content": SUMMARIZE_PROMPT.format(title=title, text=text)}
+                    *_SUMMARIZER_PREFIX,
+                    {"role": "user", "content": prompt}
                 ],
+                response_format={"type": "json_object"},
                 temperature=0.5,
                 max_tokens=max_tokens
             )
-            
-            summary = response.choices[0].message.content.strip()
-            logger.info(f"Generated summary with length {len(summary)}")
-            
-            # Cache the response
-            self._cache_response(cache_key, summary)
-            
-            return summary
-        except Exception as e:
-            logger.error(f"Error summarizing text: {str(e)}")
-            raise
+            summaries = orjson.loads(content)["summaries"]
+            # The model may return any JSON; only a list of strings is usable
+            if not isinstance(summaries, list) or not all(isinstance(summary, str) for summary in summaries):
+                raise TypeError("'summaries' is not a list of strings")
+            summaries = [summary.strip() for summary in summaries]
+        except (orjson.JSONDecodeError, KeyError, TypeError, openai.APIError) as e:
+            logger.warning(f"Batched chunk summarization failed, summarizing separately: {e}")
+            return await self.summarize_chunks(chunks, title, model, return_exceptions=return_exceptions)
+        
+        if len(summaries) != len(chunks):
+            logger.warning(f"Expected {len(chunks)} summaries, got {len(summaries)}, summarizing separately")
+            return await self.summarize_chunks(chunks, title, model, return_exceptions=return_exceptions)
+        
+        # Store per chunk so later summarize_text calls hit the cache
+        for chunk, summary in zip(chunks, summaries):
+            await self._cache_response(self._generate_cache_key(chunk, title, model), summary)
+        
+        return summaries
     
     async def combine_summaries(self, summaries: List[str], title: str, model: str = None) -> str:
         """
@@ -260,43 +963,136 @@ class AIAgent:
         if model is None:
             model = self.get_default_model("summarizer")
         
-        # Generate cache key based on all summaries
-        combined_text = "\n".join(summaries)
-        cache_key = self._generate_cache_key(combined_text, title, model)
+        # Join once: the same string is sent to the model and used for the cache key
+        combined_input = "\n\n---\n\n".join(summaries)
+        cache_key = self._generate_cache_key(combined_input, title, model)
         
         # Try to get from cache first
-        cached_response = self._get_cached_response(cache_key)
+        cached_response = await self._get_cached_response(cache_key)
         if cached_response:
             logger.info(f"Returning cached combined summary for {title}")
             return cached_response
         
-        try:
-            combined_input = "\n\n---\n\n".join(summaries)
-            logger.info(f"Combining {len(summaries)} summaries using model {model}")
+        logger.info(f"Combining {len(summaries)} summaries using model {model}")
+        
+        combined_summary = await self._chat(
+            model=model,
+            messages=[
+                *_COMBINE_PREFIX,
+                {"role": "user", "content": COMBINE_SUMMARIES_PROMPT_DYNAMIC.format(
+                    title=title, 
+                    summaries=combined_input
+                )}
+            ],
+            temperature=0.5,
+            max_tokens=1500
+        )
+        logger.info(f"Generated combined summary with length {len(combined_summary)}")
+        
+        # Cache the response
+        await self._cache_response(cache_key, combined_summary)
+        
+        return combined_summary
+    
+    async def submit_summaries_batch(self, items: List[Dict[str, str]], model: str = None) -> str:
+        """
+        Submit summarization jobs to the OpenAI Batch API.
+        Intended for non-interactive bulk work: batches are billed at half price
+        and use a separate rate-limit pool, but complete within 24 hours.
+        
+        Args:
+            items: List of dicts with "text" and "title" keys
+            model: OpenAI model to use (optional, uses default if None)
             
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPTS["summarizer"]},
-                    {"role": "user", "content": COMBINE_SUMMARIES_PROMPT.format(
-                        title=title, 
-                        summaries=combined_input
-                    )}
-                ],
-                temperature=0.5,
-                max_tokens=1500
-            )
+        Returns:
+            str: Batch ID to pass to poll_batch
+        """
+        # Use default model if none provided
+        if model is None:
+            model = self.get_default_model("summarizer")
+        
+        # One request per unique cache key; the key doubles as custom_id
+        requests = {}
+        for item in items:
+            cache_key = self._generate_cache_key(item["text"], item["title"], model)
+            requests[cache_key] = {
+                "custom_id": cache_key,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": self._build_summarize_messages(item["text"], item["title"]),
+                    "temperature": 0.5,
+                    "max_tokens": 1000
+                }
+            }
+        
+        # orjson emits compact UTF-8 bytes directly, no str round-trip needed
+        payload = b"\n".join(orjson.dumps(request) for request in requests.values())
+        
+        batch_file = await self.client.files.create(
+            file=("summaries.jsonl", payload),
+            purpose="batch"
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        logger.info(f"Submitted batch {batch.id} with {len(requests)} summarization requests using model {model}")
+        return batch.id
+    
+    async def poll_batch(self, batch_id: str) -> Optional[int]:
+        """
+        Check a batch and store its results in the response cache once it is done.
+        
+        Args:
+            batch_id: ID returned by submit_summaries_batch
             
-            combined_summary = response.choices[0].message.content.strip()
-            logger.info(f"Generated combined summary with length {len(combined_summary)}")
+        Returns:
+            Optional[int]: Number of cached summaries, or None if the batch is not finished yet
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            logger.info(f"Batch {batch_id} status: {batch.status}")
+            return None
+        
+        if not batch.output_file_id:
+            logger.warning(f"Batch {batch_id} completed without an output file")
+            return 0
+        
+        output = await self.client.files.content(batch.output_file_id)
+        
+        cached = 0
+        for line in output.content.splitlines():
+            if not line.strip():
+                continue
             
-            # Cache the response
-            self._cache_response(cache_key, combined_summary)
+            # A malformed line is skipped like a failed request, so it does not
+            # discard the results that were already cached
+            try:
+                result = orjson.loads(line)
+                custom_id = result["custom_id"]
+            except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                logger.error(f"Skipping unreadable line in batch {batch_id} output: {e}")
+                continue
             
-            return combined_summary
-        except Exception as e:
-            logger.error(f"Error combining summaries: {str(e)}")
-            raise
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.error(f"Batch request {custom_id} failed: {result.get('error') or response}")
+                continue
+            
+            try:
+                summary = response["body"]["choices"][0]["message"]["content"].strip()
+            except (KeyError, IndexError, TypeError, AttributeError) as e:
+                logger.error(f"Batch request {custom_id} returned no usable summary: {e}")
+                continue
+            
+            await self._cache_response(custom_id, summary)
+            cached += 1
+        
+        logger.info(f"Cached {cached} summaries from batch {batch_id}")
+        return cached
     
     async def get_openai_balance(self) -> Dict[str, Any]:
         """
@@ -314,23 +1110,22 @@ class AIAgent:
                 "Content-Type": "application/json"
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=headers)
-                
-                if response.status_code == 200:
-                    balance_data = response.json()
-                    logger.info(f"Successfully retrieved OpenAI balance information")
-                    return {
-                        "total_available": balance_data.get("total_available", 0),
-                        "total_used": balance_data.get("total_used", 0),
-                        "expires_at": balance_data.get("grants", {}).get("data", [{}])[0].get("expires_at", "Unknown")
-                    }
-                else:
-                    logger.error(f"Failed to get OpenAI balance: {response.status_code} - {response.text}")
-                    return {
-                        "error": f"API returned status code {response.status_code}",
-                        "message": response.text
-                    }
+            response = await self._http.get(url, headers=headers, timeout=10)
+            
+            if response.status_code == 200:
+                balance_data = response.json()
+                logger.info(f"Successfully retrieved OpenAI balance information")
+                return {
+                    "total_available": balance_data.get("total_available", 0),
+                    "total_used": balance_data.get("total_used", 0),
+                    "expires_at": balance_data.get("grants", {}).get("data", [{}])[0].get("expires_at", "Unknown")
+                }
+            else:
+                logger.error(f"Failed to get OpenAI balance: {response.status_code} - {response.text}")
+                return {
+                    "error": f"API returned status code {response.status_code}",
+                    "message": response.text
+                }
                     
         except Exception as e:
             logger.error(f"Error getting OpenAI balance: {str(e)}")
@@ -354,57 +1149,65 @@ class AIAgent:
         try:
             logger.info(f"Generating error response for URL {video_url}")
             
-            response = await self.client.chat.completions.create(
+            error_message = await self._pooled_reply("error_response", model, video_url, lambda: self._chat(
                 model=model,
                 messages=[
-                    {"role": "system", "content": SYSTEM_PROMPTS["error_handler"]},
+                    _ERROR_HANDLER_SYSTEM,
                     {"role": "user", "content": ERROR_RESPONSE_PROMPT.format(video_url=video_url)}
                 ],
-                temperature=0.7,
-                max_tokens=150
-            )
-            
-            error_message = response.choices[0].message.content.strip()
+                **_SHORT_REPLY_PARAMS
+            ))
             logger.info(f"Generated error message with length {len(error_message)}")
             return error_message
         except Exception as e:
             logger.error(f"Error generating error response: {str(e)}")
             return "Не удалось получить информацию об этом видео. Пожалуйста, проверьте ссылку и попробуйте другое видео."
     
-    async def handle_unknown_message(self, text: str, model: str = None) -> str:
+    async def handle_unknown_message_stream(self, text: str, model: str = None) -> AsyncIterator[str]:
         """
-        Generate a response for unknown messages.
+        Generate a response for unknown messages, yielding it as it is generated.
         
         Args:
             text: User's message text
             model: OpenAI model to use (optional, uses default if None)
             
-        Returns:
-            str: Response message
+        Yields:
+            str: Pieces of the response in order (a single piece for pooled replies)
         """
         # Use default model if none provided
         if model is None:
             model = self.get_default_model("error_handler")
         
+        logger.opt(lazy=True).info("Streaming reply to unknown message: {}...", lambda: text[:50])
+        
+        key, pool = await self._get_reply_pool("unknown_message", model, text)
+        if len(pool) >= REPLY_POOL_SIZE:
+            logger.info("Reply pool hit for unknown_message")
+            yield random.choice(pool)
+            return
+        
+        parts = []
         try:
-            logger.info(f"Handling unknown message: {text[:50]}...")
-            
-            response = await self.client.chat.completions.create(
+            async for delta in self._chat_stream(
                 model=model,
                 messages=[
-                    {"role": "system", "content": SYSTEM_PROMPTS["error_handler"]},
+                    _ERROR_HANDLER_SYSTEM,
                     {"role": "user", "content": UNKNOWN_MESSAGE_PROMPT.format(text=text)}
                 ],
-                temperature=0.7,
-                max_tokens=150
-            )
-            
-            message = response.choices[0].message.content.strip()
-            logger.info(f"Generated response for unknown message with length {len(message)}")
-            return message
-        except Exception as e:
-            logger.error(f"Error handling unknown message: {str(e)}")
-            return "Бот работает только с ссылками на YouTube видео. Пожалуйста, отправьте ссылку на YouTube видео."
+                **_SHORT_REPLY_PARAMS
+            ):
+                parts.append(delta)
+                yield delta
+        except openai.APIError as e:
+            logger.error(f"Error streaming reply to unknown message: {str(e)}")
+            if not parts:
+                yield UNKNOWN_MESSAGE_FALLBACK
+            return
+        
+        reply = "".join(parts).strip()
+        logger.info(f"Generated streamed response for unknown message with length {len(reply)}")
+        if reply:
+            await self._add_pooled_reply(key, pool, reply)
             
     async def generate_admin_notification(self, user_data: Dict[str, Any], model: str = None) -> str:
         """
@@ -424,17 +1227,15 @@ class AIAgent:
         try:
             logger.info(f"Generating admin notification for user {user_data.get('user_id')}")
             
-            response = await self.client.chat.completions.create(
+            message = await self._chat(
                 model=model,
                 messages=[
-                    {"role": "system", "content": SYSTEM_PROMPTS["admin_assistant"]},
+                    _ADMIN_ASSISTANT_SYSTEM,
                     {"role": "user", "content": ACCESS_REQUEST_ADMIN_PROMPT.format(**user_data)}
                 ],
                 temperature=0.3,
                 max_tokens=200
             )
-            
-            message = response.choices[0].message.content.strip()
             logger.info(f"Generated admin notification with length {len(message)}")
             return message
         except Exception as e:
@@ -6,45 +6,64 @@ import signal
 import sys
 from loguru import logger
 from src.bot.telegram_bot import TelegramBot
+from src.config.settings import LOG_LEVEL, BOT_MODE
 
-# Global variable to hold the bot instance
-bot_instance = None
+# uvloop (libuv-based event loop) makes every await cheaper; optional, and not available on Windows
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
-def signal_handler(signum, frame):
-    """Handle shutdown signals gracefully."""
-    logger.info(f"Received signal {signum}, initiating graceful shutdown...")
-    if bot_instance:
-        # Cancel all running tasks
-        for task in asyncio.all_tasks():
-            task.cancel()
-    sys.exit(0)
+# Apply the configured level to loguru (its default handler logs everything from DEBUG).
+# enqueue=True hands records to a background writer thread, so a slow terminal,
+# pipe or disk never blocks the event loop
+logger.remove()
+logger.add(sys.stderr, level=LOG_LEVEL, enqueue=True)
+
+# How long to wait for polling or the webhook server to wind down after a shutdown request
+SHUTDOWN_TIMEOUT = 10  # seconds
 
 async def main():
     """Main entry point for the application with enhanced error handling."""
-    global bot_instance
-    
-    # Set up signal handlers for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Signals only set an event; shutdown then runs on the normal cleanup path
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
     
     try:
         logger.info("Starting YouTube Summarizer Bot")
-        bot_instance = TelegramBot()
-        await bot_instance.start()
+        bot = TelegramBot()
+        
+        # Webhook mode for high-volume deployments, polling otherwise
+        running = asyncio.create_task(bot.start_webhook() if BOT_MODE == "webhook" else bot.start())
+        stopping = asyncio.create_task(stop.wait())
+        done, _ = await asyncio.wait({running, stopping}, return_when=asyncio.FIRST_COMPLETED)
         
-    except KeyboardInterrupt:
-        logger.info("Bot stopped by user (KeyboardInterrupt)")
+        if stopping in done:
+            logger.info("Received shutdown signal, initiating graceful shutdown...")
+            await bot.shutdown()
+            finished, _ = await asyncio.wait({running}, timeout=SHUTDOWN_TIMEOUT)
+            if not finished:
+                running.cancel()
+        else:
+            stopping.cancel()
+            # Re-raise anything start() failed with
+            running.result()
         
     except Exception as e:
-        logger.critical(f"Critical error starting bot: {str(e)}", exc_info=True)
+        logger.opt(exception=True).critical(f"Critical error starting bot: {str(e)}")
         return 1  # Return error code instead of sys.exit
         
     finally:
         logger.info("Cleaning up resources...")
-        # Add any cleanup code here if needed
+        # Flush records still queued for the background log writer
+        await logger.complete()
         
     return 0
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     exit_code = asyncio.run(main())
     sys.exit(exit_code)
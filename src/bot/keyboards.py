@@ -8,9 +8,13 @@ from aiogram.types import (
     ReplyKeyboardMarkup, 
     KeyboardButton
 )
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
-def create_main_keyboard() -> ReplyKeyboardMarkup:
+# Users shown per page of the admin user list
+USERS_PAGE_SIZE = 5
+
+def _build_main_keyboard() -> ReplyKeyboardMarkup:
     """
     Creates the main keyboard with command buttons.
     
@@ -33,7 +37,18 @@ def create_main_keyboard() -> ReplyKeyboardMarkup:
     
     return keyboard
 
-def create_admin_keyboard() -> ReplyKeyboardMarkup:
+_MAIN_KEYBOARD = _build_main_keyboard()
+
+def create_main_keyboard() -> ReplyKeyboardMarkup:
+    """
+    Returns the main keyboard, built once at import.
+    
+    Returns:
+        ReplyKeyboardMarkup: Main keyboard (shared, do not mutate)
+    """
+    return _MAIN_KEYBOARD
+
+def _build_admin_keyboard() -> ReplyKeyboardMarkup:
     """
     Creates the admin keyboard with additional admin commands.
     
@@ -58,51 +73,70 @@ def create_admin_keyboard() -> ReplyKeyboardMarkup:
     
     return keyboard
 
-def create_models_keyboard(models: List[str], current_model: Optional[str] = None) -> InlineKeyboardMarkup:
+_ADMIN_KEYBOARD = _build_admin_keyboard()
+
+def create_admin_keyboard() -> ReplyKeyboardMarkup:
     """
-    Creates a keyboard for model selection.
+    Returns the admin keyboard, built once at import.
+    
+    Returns:
+        ReplyKeyboardMarkup: Admin keyboard (shared, do not mutate)
+    """
+    return _ADMIN_KEYBOARD
+
+# Model categories for sorting as (prefix, rank), listed longest prefix first so
+# that e.g. "gpt-4o-mini" is not filed under "gpt-4o" or "gpt-4-turbo" under "gpt-4"
+_CATEGORY_PREFIXES = (
+    ("gpt-3.5-turbo-16k", 6),
+    ("gpt-3.5-turbo", 7),
+    ("gpt-4o-mini", 3),
+    ("gpt-4-turbo", 5),
+    ("gpt-4.5", 1),
+    ("gpt-4o", 2),
+    ("gpt-4", 4)
+)
+
+@lru_cache(maxsize=256)
+def _model_rank(model: str) -> int:
+    """Category rank of a model (99 for unknown models); the first match is the longest prefix."""
+    for prefix, rank in _CATEGORY_PREFIXES:
+        if model.startswith(prefix):
+            return rank
+    return 99
+
+def _model_sort_key(model: str) -> Tuple[int, str]:
+    """Sort key: category rank, then name."""
+    return _model_rank(model), model
+
+@lru_cache(maxsize=8)
+def _sort_models(models: Tuple[str, ...]) -> Tuple[str, ...]:
+    """
+    Deduplicates and sorts models by category, then by name.
     
     Args:
-        models: List of available models
+        models: Available models
+        
+    Returns:
+        Tuple[str, ...]: Sorted unique models
+    """
+    return tuple(sorted(dict.fromkeys(models), key=_model_sort_key))
+
+@lru_cache(maxsize=64)
+def _build_models_keyboard(models: Tuple[str, ...], current_model: Optional[str]) -> InlineKeyboardMarkup:
+    """
+    Builds the model selection keyboard; cached per model list and current model.
+    
+    Args:
+        models: Available models
         current_model: Currently selected model
         
     Returns:
         InlineKeyboardMarkup: Model selection keyboard
     """
-    # Model categories for sorting
-    model_categories = {
-        "gpt-4.5": 1,
-        "gpt-4o": 2,
-        "gpt-4o-mini": 3,
-        "gpt-4": 4,
-        "gpt-4-turbo": 5,
-        "gpt-3.5-turbo-16k": 6,
-        "gpt-3.5-turbo": 7
-    }
-    
-    # Sort models by category
-    sorted_models = sorted(models, key=lambda x: (
-        next((i for prefix, i in model_categories.items() if x.startswith(prefix)), 99),
-        x
-    ))
-    
-    # Create buttons for models
     keyboard_buttons = []
-    added_models = set()
-    
-    for model in sorted_models:
-        # Skip if already added (absolute duplicates)
-        if model in added_models:
-            continue
-            
-        # Add to processed list
-        added_models.add(model)
-        
+    for model in _sort_models(models):
         # Mark current model
-        is_current = (model == current_model)
-        button_text = f"{model} ✓" if is_current else model
-        
-        # Add button to the list
+        button_text = f"{model} ✓" if model == current_model else model
         keyboard_buttons.append([
             InlineKeyboardButton(text=button_text, callback_data=f"set_model:{model}")
         ])
@@ -112,12 +146,22 @@ def create_models_keyboard(models: List[str], current_model: Optional[str] = Non
         InlineKeyboardButton(text="⬅️ Назад", callback_data="back_to_main")
     ])
     
-    # Create the keyboard with the buttons
-    keyboard = InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
+    return InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
+
+def create_models_keyboard(models: List[str], current_model: Optional[str] = None) -> InlineKeyboardMarkup:
+    """
+    Creates a keyboard for model selection.
     
-    return keyboard
+    Args:
+        models: List of available models
+        current_model: Currently selected model
+        
+    Returns:
+        InlineKeyboardMarkup: Model selection keyboard (shared, do not mutate)
+    """
+    return _build_models_keyboard(tuple(models), current_model)
 
-def create_language_keyboard() -> InlineKeyboardMarkup:
+def _build_language_keyboard() -> InlineKeyboardMarkup:
     """
     Creates a keyboard for language selection.
     
@@ -152,7 +196,18 @@ def create_language_keyboard() -> InlineKeyboardMarkup:
     
     return keyboard
 
-def create_settings_keyboard() -> InlineKeyboardMarkup:
+_LANGUAGE_KEYBOARD = _build_language_keyboard()
+
+def create_language_keyboard() -> InlineKeyboardMarkup:
+    """
+    Returns the language selection keyboard, built once at import.
+    
+    Returns:
+        InlineKeyboardMarkup: Language selection keyboard (shared, do not mutate)
+    """
+    return _LANGUAGE_KEYBOARD
+
+def _build_settings_keyboard() -> InlineKeyboardMarkup:
     """
     Creates a keyboard for settings.
     
@@ -175,7 +230,18 @@ def create_settings_keyboard() -> InlineKeyboardMarkup:
     
     return keyboard
 
-def create_access_request_keyboard() -> InlineKeyboardMarkup:
+_SETTINGS_KEYBOARD = _build_settings_keyboard()
+
+def create_settings_keyboard() -> InlineKeyboardMarkup:
+    """
+    Returns the settings keyboard, built once at import.
+    
+    Returns:
+        InlineKeyboardMarkup: Settings keyboard (shared, do not mutate)
+    """
+    return _SETTINGS_KEYBOARD
+
+def _build_access_request_keyboard() -> InlineKeyboardMarkup:
     """
     Creates a keyboard for requesting access.
     
@@ -192,15 +258,28 @@ def create_access_request_keyboard() -> InlineKeyboardMarkup:
     
     return keyboard
 
+_ACCESS_REQUEST_KEYBOARD = _build_access_request_keyboard()
+
+def create_access_request_keyboard() -> InlineKeyboardMarkup:
+    """
+    Returns the access request keyboard, built once at import.
+    
+    Returns:
+        InlineKeyboardMarkup: Access request keyboard (shared, do not mutate)
+    """
+    return _ACCESS_REQUEST_KEYBOARD
+
+@lru_cache(maxsize=256)
 def create_admin_notification_keyboard(user_id: int) -> InlineKeyboardMarkup:
     """
-    Creates a keyboard for admin to approve/reject access request.
+    Creates a keyboard for admin to approve/reject access request;
+    cached per user.
     
     Args:
         user_id: ID of the user requesting access
         
     Returns:
-        InlineKeyboardMarkup: Admin notification keyboard
+        InlineKeyboardMarkup: Admin notification keyboard (shared, do not mutate)
     """
     # Approval options
     grant_unlimited = InlineKeyboardButton(
@@ -238,40 +317,35 @@ def create_admin_notification_keyboard(user_id: int) -> InlineKeyboardMarkup:
     
     return keyboard
 
-def create_user_list_keyboard(users: List, page: int = 0, page_size: int = 5) -> InlineKeyboardMarkup:
+def _user_button_text(user) -> str:
+    """Button label for a user: display name, plus @username when it differs."""
+    # Show username or display name instead of just ID
+    if user.username and user.username != user.display_name:
+        return f"👤 {user.display_name} (@{user.username})"
+    return f"👤 {user.display_name}"
+
+def create_user_list_keyboard(users: List, total: int, page: int = 0,
+                              page_size: int = USERS_PAGE_SIZE) -> InlineKeyboardMarkup:
     """
     Creates a keyboard for user list with pagination.
     
     Args:
-        users: List of User objects
+        users: User objects on the current page
+        total: Total number of users in the list
         page: Current page number
         page_size: Number of users per page
         
     Returns:
         InlineKeyboardMarkup: User list keyboard
     """
-    # Calculate pagination
-    total_pages = (len(users) - 1) // page_size + 1
-    start_idx = page * page_size
-    end_idx = min(start_idx + page_size, len(users))
-    current_page_users = users[start_idx:end_idx]
-    
-    # Create buttons list
-    keyboard_buttons = []
+    # Ceiling division
+    total_pages = -(-total // page_size)
     
-    # Add user buttons
-    for user in current_page_users:
-        # Show username or display name instead of just ID
-        display_text = f"👤 {user.display_name}"
-        if user.username and user.username != user.display_name:
-            display_text += f" (@{user.username})"
-        
-        keyboard_buttons.append([
-            InlineKeyboardButton(
-                text=display_text, 
-                callback_data=f"user_info:{user.user_id}"
-            )
-        ])
+    # One row per user button
+    keyboard_buttons = [
+        [InlineKeyboardButton(text=_user_button_text(user), callback_data=f"user_info:{user.user_id}")]
+        for user in users
+    ]
     
     # Add pagination buttons if necessary
     if total_pages > 1:
@@ -315,6 +389,7 @@ def create_user_list_keyboard(users: List, page: int = 0, page_size: int = 5) ->
     
     return keyboard
 
+@lru_cache(maxsize=256)
 def create_user_management_keyboard(user_id: int) -> InlineKeyboardMarkup:
     """
     Creates a keyboard for managing a specific user.
@@ -381,54 +456,60 @@ def create_user_management_keyboard(user_id: int) -> InlineKeyboardMarkup:
     
     return keyboard 
 
-def create_admin_model_selection_keyboard(user_id: int, models: List[str]) -> InlineKeyboardMarkup:
+_DASH_TO_SPACE = str.maketrans("-", " ")
+
+@lru_cache(maxsize=128)
+def model_display_name(model: str) -> str:
     """
-    Creates a keyboard for admin to select a model for a user.
+    Formats a model ID for button labels (e.g. "gpt-4o-mini" -> "Gpt 4O Mini").
+    
+    Args:
+        model: Model ID
+        
+    Returns:
+        str: Display name
+    """
+    return model.replace("gpt-", "GPT-").translate(_DASH_TO_SPACE).title()
+
+@lru_cache(maxsize=64)
+def _build_admin_model_selection_keyboard(user_id: int, models: Tuple[str, ...]) -> InlineKeyboardMarkup:
+    """
+    Builds the admin model selection keyboard; cached per user and model list.
     
     Args:
         user_id: ID of the user to set model for
-        models: List of available models
+        models: Available models
         
     Returns:
         InlineKeyboardMarkup: Model selection keyboard for admin
     """
-    keyboard_buttons = []
-    
-    # Add model buttons (2 per row)
-    for i in range(0, len(models), 2):
-        row = []
-        for j in range(2):
-            if i + j < len(models):
-                model = models[i + j]
-                display_name = model.replace("gpt-", "GPT-").replace("-", " ").title()
-                
-                button = InlineKeyboardButton(
-                    text=display_name,
-                    callback_data=f"admin_set_model:{user_id}:{model}"
-                )
-                row.append(button)
-        keyboard_buttons.append(row)
-    
-    # Add control buttons
-    lock_and_set_row = [
-        InlineKeyboardButton(
-            text="🔒 Заблокировать модель",
-            callback_data=f"admin_set_model_locked:{user_id}"
-        )
+    model_buttons = [
+        InlineKeyboardButton(text=model_display_name(model), callback_data=f"admin_set_model:{user_id}:{model}")
+        for model in models
     ]
     
-    back_row = [
-        InlineKeyboardButton(
-            text="⬅️ Назад к управлению",
-            callback_data=f"user_info:{user_id}"
-        )
-    ]
-    
-    keyboard_buttons.append(lock_and_set_row)
-    keyboard_buttons.append(back_row)
+    return InlineKeyboardMarkup(inline_keyboard=[
+        # Model buttons (2 per row)
+        *(model_buttons[i:i + 2] for i in range(0, len(model_buttons), 2)),
+        # Control buttons
+        [InlineKeyboardButton(text="🔒 Заблокировать модель", callback_data=f"admin_set_model_locked:{user_id}")],
+        [InlineKeyboardButton(text="⬅️ Назад к управлению", callback_data=f"user_info:{user_id}")]
+    ])
+
+def create_admin_model_selection_keyboard(user_id: int, models: List[str]) -> InlineKeyboardMarkup:
+    """
+    Creates a keyboard for admin to select a model for a user.
     
-    return InlineKeyboardMarkup(inline_keyboard=keyboard_buttons)
+    Args:
+        user_id: ID of the user to set model for
+        models: List of available models
+        
+    Returns:
+        InlineKeyboardMarkup: Model selection keyboard for admin (shared, do not mutate)
+    """
+    return _build_admin_model_selection_keyboard(user_id, tuple(models))
 
+@lru_cache(maxsize=256)
 def create_model_lock_options_keyboard(user_id: int) -> InlineKeyboardMarkup:
     """
     Creates a keyboard for managing model lock options.
@@ -0,0 +1,123 @@
+"""
+Middlewares for the YouTube Summarizer Bot.
+Prepare data shared by all handlers and throttle updates before handlers run.
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import CallbackQuery, Message, TelegramObject
+from loguru import logger
+
+from .rate_limiter import TokenBucket
+
+class UserMiddleware(BaseMiddleware):
+    """
+    Loads the sender of an update once and passes it to the handler as
+    its `user` argument, so handlers never look the user up themselves.
+    """
+    
+    def __init__(self, get_or_create_user: Callable[..., Awaitable[Any]]):
+        """
+        Initialize the middleware.
+        
+        Args:
+            get_or_create_user: Coroutine function returning the user for
+                a Telegram ID, creating it from the given profile if needed
+        """
+        self.get_or_create_user = get_or_create_user
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Add the sender to the handler data and call the handler.
+        
+        Args:
+            handler: Next handler in the chain
+            event: Incoming message or callback query
+            data: Handler data
+        
+        Returns:
+            Any: Handler result
+        """
+        # Set by aiogram's built-in context middleware for every update
+        from_user = data.get("event_from_user")
+        if from_user is not None:
+            data["user"] = await self.get_or_create_user(
+                user_id=from_user.id,
+                username=from_user.username,
+                first_name=from_user.first_name,
+                last_name=from_user.last_name
+            )
+        return await handler(event, data)
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Drops updates from a user who sends messages or presses buttons faster
+    than a per-user token bucket allows, so one user cannot flood the bot
+    with database work and OpenAI calls at the expense of everyone else.
+    """
+    
+    def __init__(self, rate: float, burst: float, max_users: int = 10000):
+        """
+        Initialize the middleware.
+        
+        Args:
+            rate: Updates per second allowed per user
+            burst: Updates a user may send back to back
+            max_users: Maximum number of per-user buckets kept in memory
+        """
+        self.rate = rate
+        self.burst = burst
+        # Bounded LRU of per-user buckets; an evicted user simply starts with a full bucket
+        self._buckets: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self.max_users = max_users
+        # Users already told to slow down; they are told again only after an allowed update
+        self._warned = set()
+    
+    def _bucket(self, user_id: int) -> TokenBucket:
+        """Get or create the bucket of a user, evicting the oldest when full."""
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_users:
+                evicted, _ = self._buckets.popitem(last=False)
+                self._warned.discard(evicted)
+        else:
+            self._buckets.move_to_end(user_id)
+        return bucket
+    
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Call the handler if the sender is within the limit, otherwise drop the update.
+        
+        Args:
+            handler: Next handler in the chain
+            event: Incoming message or callback query
+            data: Handler data
+        
+        Returns:
+            Any: Handler result, or None if the update was dropped
+        """
+        from_user = data.get("event_from_user")
+        if from_user is None or self._bucket(from_user.id).try_acquire():
+            if from_user is not None:
+                self._warned.discard(from_user.id)
+            return await handler(event, data)
+        
+        logger.warning(f"Throttled update from user {from_user.id}")
+        if isinstance(event, CallbackQuery):
+            # Callback queries must be answered anyway, or the button keeps spinning
+            await event.answer("⏳ Слишком часто, подождите немного")
+        elif isinstance(event, Message) and from_user.id not in self._warned:
+            self._warned.add(from_user.id)
+            await event.answer("⏳ Слишком часто, подождите немного", parse_mode=None)
+        return None
@@ -0,0 +1,139 @@
+"""
+Rate limiting for the YouTube Summarizer Bot.
+Keeps outgoing Telegram requests under the API limits, and retries the
+rare request that still runs into 429 (Too Many Requests).
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramRetryAfter
+from loguru import logger
+
+class TokenBucket:
+    """
+    Token bucket: allows bursts of up to `capacity` acquisitions and
+    refills at `rate` tokens per second.
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of stored tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        """Add the tokens accumulated since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def try_acquire(self) -> bool:
+        """
+        Take a token if one is available, without waiting.
+        
+        Returns:
+            bool: True if a token was taken
+        """
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+    
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it; waiters are served in order."""
+        async with self._lock:
+            while not self.try_acquire():
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+class TelegramRateLimiter:
+    """
+    Paces outgoing messages against Telegram's limits: a bot-wide budget
+    (~30 messages/s) and a per-chat budget (~1 message/s with short bursts).
+    """
+    
+    def __init__(self, global_rate: float = 30, chat_rate: float = 1, chat_burst: float = 3,
+                 max_chats: int = 10000):
+        """
+        Initialize the limiter.
+        
+        Args:
+            global_rate: Messages per second across all chats
+            chat_rate: Messages per second to a single chat
+            chat_burst: Messages that may be sent to a chat back to back
+            max_chats: Maximum number of per-chat buckets kept in memory
+        """
+        self._global = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        # Bounded LRU of per-chat buckets; an evicted chat simply starts with a full bucket
+        self._chats: "OrderedDict[int, TokenBucket]" = OrderedDict()
+        self.max_chats = max_chats
+    
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        """Get or create the bucket of a chat, evicting the oldest when full."""
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst)
+            if len(self._chats) > self.max_chats:
+                self._chats.popitem(last=False)
+        else:
+            self._chats.move_to_end(chat_id)
+        return bucket
+    
+    async def wait(self, chat_id: int) -> None:
+        """
+        Wait until a message may be sent to a chat.
+        
+        Args:
+            chat_id: Telegram chat the message goes to
+        """
+        await self._chat_bucket(chat_id).acquire()
+        await self._global.acquire()
+
+class RetryAfterMiddleware(BaseRequestMiddleware):
+    """
+    Bot API request middleware that waits and retries when Telegram answers
+    429 (Too Many Requests), so a limit hit delays a message instead of
+    losing it. Applies to every API call made through the bot session.
+    """
+    
+    def __init__(self, max_retries: int = 3):
+        """
+        Initialize the middleware.
+        
+        Args:
+            max_retries: Retries per request before the error is raised
+        """
+        self.max_retries = max_retries
+    
+    async def __call__(self, make_request, bot, method) -> Any:
+        """
+        Make the request, retrying after the delay Telegram asks for.
+        
+        Args:
+            make_request: Next request handler in the chain
+            bot: Bot making the request
+            method: Bot API method being called
+        
+        Returns:
+            Any: Bot API response
+        """
+        for attempt in range(self.max_retries):
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as e:
+                logger.warning(f"Telegram flood control on {type(method).__name__}, retrying in {e.retry_after}s "
+                               f"(attempt {attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(e.retry_after)
+        return await make_request(bot, method)
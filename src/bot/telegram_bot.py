@@ -3,20 +3,38 @@ Telegram Bot for YouTube Summarizer Bot.
 Handles user interactions, commands, and button presses.
 """
 import re
+import random
 import asyncio
-from typing import Dict, Any, Optional
 from datetime import datetime
-from aiogram import Bot, Dispatcher, types
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, BotCommand
+from functools import cached_property
+from typing import AsyncIterator, Dict, Iterable, Iterator, Optional, Tuple
+from aiogram import Bot, Dispatcher, F, types
+from aiogram.types import Message, CallbackQuery, BotCommand, ErrorEvent
 from aiogram.enums import ParseMode
+from aiogram.exceptions import (
+    TelegramAPIError, TelegramBadRequest, TelegramConflictError, TelegramNetworkError
+)
+from aiogram.utils.backoff import BackoffConfig
 from aiogram.filters import Command
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
 from loguru import logger
+import orjson
 
-from src.config.settings import TELEGRAM_BOT_TOKEN, ADMIN_USER_ID, YOUTUBE_REGEX
+from src.config.settings import (
+    TELEGRAM_BOT_TOKEN, YOUTUBE_REGEX, MAX_MESSAGE_LENGTH,
+    BOT_MODE, WEBHOOK_URL, WEBHOOK_PATH, WEBHOOK_HOST, WEBHOOK_PORT,
+    WEBHOOK_SECRET, WEBHOOK_MAX_CONNECTIONS, MAX_CONCURRENT_JOBS,
+    USER_RATE_LIMIT, USER_RATE_BURST
+)
+from src.models.user import User
 from src.models.user_db_manager import UserDatabaseManager
 from src.youtube_processor import YouTubeProcessor
 from src.summarizer import Summarizer
 from src.ai_agent import AIAgent
+from .rate_limiter import RetryAfterMiddleware, TelegramRateLimiter
+from .middlewares import ThrottlingMiddleware, UserMiddleware
 from .keyboards import (
     create_main_keyboard,
     create_admin_keyboard,
@@ -26,10 +44,310 @@ from .keyboards import (
     create_access_request_keyboard,
     create_admin_notification_keyboard,
     create_user_list_keyboard,
+    USERS_PAGE_SIZE,
     create_user_management_keyboard,
     create_admin_model_selection_keyboard,
-    create_model_lock_options_keyboard
+    create_model_lock_options_keyboard,
+    model_display_name
+)
+
+# Compiled once; checked against every incoming message
+_YT_RE = re.compile(YOUTUBE_REGEX)
+
+# Mentions of YouTube in messages that are not a supported video link
+_YT_TERM_RE = re.compile(r'youtu\.?be|ютуб|ютюб', re.IGNORECASE)
+
+# Characters that start a legacy Markdown entity
+_MD_ESCAPE_RE = re.compile(r'([_*`\[])')
+
+# Legacy Markdown entity markers; escaped characters are matched so they are skipped
+_MD_TOKEN_RE = re.compile(r'\\.|```|[`*_]')
+
+# Room kept in each split part for closing and reopening Markdown markers
+_MD_RESERVE = 12
+
+# Minimum pause between edits of a streamed reply (Telegram throttles frequent edits)
+STREAM_EDIT_INTERVAL = 1.0  # seconds
+
+# How long Telegram may hold a getUpdates request open while waiting for updates
+POLLING_TIMEOUT = 50  # seconds
+
+# Command menu shown by Telegram clients
+_BOT_COMMANDS = [
+    BotCommand(command="start", description="Запустить бота"),
+    BotCommand(command="help", description="Помощь по использованию"),
+    BotCommand(command="models", description="Выбрать модель"),
+    BotCommand(command="language", description="Выбрать язык"),
+    BotCommand(command="settings", description="Настройки")
+]
+
+# Bot-wide cap on in-flight message sends (Telegram allows ~30 messages/s)
+TELEGRAM_SEND_CONCURRENCY = 25
+
+# Ready-made replies for empty/very short messages and unknown commands,
+# which are not worth an OpenAI call
+_STATIC_REPLIES = (
+    "🤷 Ну и что мне с этим делать? Кидай ссылку на YouTube видео!",
+    "👀 Маловато будет. Мне нужна ссылка на YouTube видео.",
+    "🤖 Я не телепат, братан. Пришли ссылку на видео с YouTube.",
+    "😏 Глубокая мысль. А теперь ссылку на YouTube, пожалуйста.",
+    "🎥 Я работаю только с YouTube видео. Ссылку давай!",
+    "🙃 Такой команды не знаю. Зато знаю, что делать с YouTube ссылками.",
+    "📎 Без ссылки на YouTube видео я просто красивый бот. Отправь ссылку!",
+    "🧐 Интригующе, но непонятно. Кидай ссылку на ютуб-видео.",
+    "⌨️ Клавиатура залипла? Мне нужна ссылка на YouTube видео.",
+    "💤 Я проснулся, но ссылки так и не увидел. Пришли YouTube видео!"
+)
+
+# Fixed texts of the menus, built once at import
+_ADMIN_PANEL_HEADER = "🔧 *Административная панель*\n\n"
+
+_WELCOME_BODY = (
+    "🎥 Я помогу вам создать краткое содержание любого YouTube видео!\n\n"
+    "📎 Просто отправьте мне ссылку на YouTube видео, и я проанализирую его содержание.\n\n"
+    "⚙️ Используйте кнопки ниже для настройки бота."
+)
+
+_MAIN_MENU_TEXT_USER = "👋 Главное меню\n\nВыберите действие:"
+_MAIN_MENU_TEXT_ADMIN = f"👋 Главное меню\n\n{_ADMIN_PANEL_HEADER}Выберите действие:"
+
+_HELP_TEXT_HEAD = (
+    "📖 *Руководство по использованию бота*\n\n"
+    "🎥 *Основная функция:*\n"
+    "Отправьте ссылку на YouTube видео, и бот создаст его краткое содержание\n\n"
+    "🔧 *Доступные команды:*\n"
+    "• /start - Запустить бота\n"
+    "• /help - Показать эту справку\n"
+    "• /models - Выбрать модель ИИ\n"
+    "• /language - Выбрать язык субтитров\n"
+    "• /settings - Настройки бота\n\n"
+    "⚙️ *Кнопки управления:*\n"
+    "• 🔄 Выбрать модель - изменить модель ИИ\n"
+    "• 🌐 Выбрать язык - настроить языки субтитров\n"
+    "• ⚙️ Настройки - дополнительные опции\n\n"
+)
+_HELP_TEXT_ADMIN_BLOCK = (
+    "👑 *Административные функции:*\n"
+    "• 👥 Пользователи - управление пользователями\n"
+    "• Одобрение запросов доступа\n"
+    "• Управление лимитами пользователей\n\n"
 )
+_HELP_TEXT_TAIL = (
+    "📝 *Поддерживаемые форматы ссылок:*\n"
+    "• youtube.com/watch?v=...\n"
+    "• youtu.be/...\n"
+    "• youtube.com/shorts/...\n\n"
+    "💡 *Совет:* Бот работает лучше всего с видео, у которых есть субтитры на русском или английском языке."
+)
+_HELP_TEXT_USER = _HELP_TEXT_HEAD + _HELP_TEXT_TAIL
+_HELP_TEXT_ADMIN = _HELP_TEXT_HEAD + _HELP_TEXT_ADMIN_BLOCK + _HELP_TEXT_TAIL
+
+_ABOUT_TEXT = (
+    "ℹ️ *О боте YouTube Summarizer*\n\n"
+    "🎯 *Назначение:*\n"
+    "Создание кратких аналитических обзоров YouTube видео\n\n"
+    "🔧 *Технологии:*\n"
+    "• OpenAI GPT для анализа\n"
+    "• YouTube Transcript API для субтитров\n"
+    "• Aiogram для Telegram интеграции\n\n"
+    "📊 *Возможности:*\n"
+    "• Поддержка нескольких языков\n"
+    "• Выбор различных моделей ИИ\n"
+    "• Структурированный анализ контента\n\n"
+    "👨‍💻 *Разработка:* 2024"
+)
+
+# Shown as plain text when a generated error explanation cannot be sent
+_PROCESSING_ERROR_TEXT = (
+    "❌ Произошла ошибка при обработке видео. "
+    "Пожалуйста, проверьте ссылку и попробуйте снова."
+)
+
+def _escape_markdown(text: str) -> str:
+    """
+    Escape legacy Markdown markers in user-provided text (names, usernames),
+    so a name like "john_doe" does not make Telegram reject the whole message.
+    
+    Args:
+        text: Text to insert into a Markdown message
+        
+    Returns:
+        str: Text shown literally by Telegram
+    """
+    return _MD_ESCAPE_RE.sub(r'\\\1', text)
+
+def _open_markdown(text: str, opened: Tuple[str, ...] = ()) -> Tuple[str, ...]:
+    """
+    Tracks which Markdown entities are still open at the end of text.
+    
+    Args:
+        text: Text to scan
+        opened: Markers already open before text, innermost last
+        
+    Returns:
+        Tuple[str, ...]: Markers open at the end of text, innermost last
+    """
+    stack = list(opened)
+    for match in _MD_TOKEN_RE.finditer(text):
+        marker = match.group()
+        if marker[0] == "\\":
+            continue
+        if stack and stack[-1] in ("```", "`"):
+            # Inside code only the matching marker counts
+            if marker == stack[-1]:
+                stack.pop()
+        elif marker in stack:
+            stack.remove(marker)
+        else:
+            stack.append(marker)
+    return tuple(stack)
+
+def _reopen_markdown(opened: Tuple[str, ...]) -> str:
+    """Markers that reopen the given Markdown entities at the start of a new message."""
+    return "".join("```\n" if marker == "```" else marker for marker in opened)
+
+def _cut_message(text: str, limit: int) -> Tuple[str, str]:
+    """
+    Cuts a message that is still being written once it exceeds limit.
+    
+    Args:
+        text: Text written so far
+        limit: Maximum message length
+        
+    Returns:
+        Tuple[str, str]: Finished head ending at a line or word boundary,
+        and the tail to continue in a new message (empty if nothing to cut)
+    """
+    if len(text) <= limit:
+        return text, ""
+    cut = text.rfind("\n", 0, limit)
+    if cut <= 0:
+        cut = text.rfind(" ", 0, limit)
+    if cut <= 0:
+        cut = limit
+    tail = text[cut:].strip()
+    return (text[:cut], tail) if tail else (text, "")
+
+def _balance_markdown(parts: Iterable[str]) -> Iterator[str]:
+    """
+    Closes Markdown entities left open at the end of each part and reopens
+    them at the start of the next, so every part parses on its own.
+    
+    Args:
+        parts: Message texts in order
+        
+    Yields:
+        str: Message texts with balanced Markdown
+    """
+    opened = ()
+    for part in parts:
+        prefix = _reopen_markdown(opened)
+        opened = _open_markdown(part, opened)
+        yield prefix + part + "".join(reversed(opened))
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> Iterator[str]:
+    """
+    Splits text into Telegram-sized messages on paragraph boundaries,
+    falling back to line, word and finally hard character boundaries.
+    Bold, italic and code spans cut by a boundary are closed and reopened,
+    so Telegram does not reject a part over unbalanced Markdown.
+    Parts are produced lazily, so each one is built only when it is sent.
+    
+    Args:
+        text: Text to split
+        limit: Maximum message length
+        
+    Yields:
+        str: Message texts in order
+    """
+    if len(text) <= limit:
+        yield text
+        return
+    
+    yield from _balance_markdown(_split_text(text, limit - _MD_RESERVE))
+
+def _split_points(text: str, limit: int) -> Iterator[Tuple[str, str]]:
+    """
+    Breaks text into pieces of at most limit characters: whole paragraphs
+    where they fit, otherwise lines, then words, then hard character cuts.
+    
+    Args:
+        text: Text to break up
+        limit: Maximum piece length
+        
+    Yields:
+        Tuple[str, str]: Separator that precedes the piece, and the piece
+    """
+    for paragraph in text.split("\n\n"):
+        if not paragraph.strip():
+            continue
+        if len(paragraph) <= limit:
+            yield "\n\n", paragraph
+            continue
+        separator = "\n\n"
+        for line in paragraph.split("\n"):
+            if len(line) <= limit:
+                yield separator, line
+                separator = "\n"
+                continue
+            for word in line.split(" "):
+                for i in range(0, len(word), limit):
+                    yield separator, word[i:i + limit]
+                    # Continuation of a hard-cut word follows without a gap
+                    separator = ""
+                separator = " "
+            separator = "\n"
+
+def _split_text(text: str, limit: int) -> Iterator[str]:
+    """
+    Splits text into as few pieces of at most limit characters as
+    possible, preferring paragraph, then line, then word boundaries.
+    Every message is filled greedily, including around paragraphs that
+    themselves had to be broken up.
+    
+    Args:
+        text: Text to split
+        limit: Maximum piece length
+        
+    Yields:
+        str: Pieces in order
+    """
+    buffer = []
+    size = 0
+    for separator, piece in _split_points(text, limit):
+        if buffer and size + len(separator) + len(piece) > limit:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+        if buffer:
+            buffer.append(separator)
+            size += len(separator)
+        buffer.append(piece)
+        size += len(piece)
+    if buffer:
+        yield "".join(buffer)
+
+def _youtube_link_filter(message: Message):
+    """
+    Message filter for YouTube video links. Every supported link contains
+    "youtu", so the cheap substring test skips the regex for ordinary messages.
+    
+    Args:
+        message: Incoming message
+        
+    Returns:
+        dict with the matched link as "url" (aiogram passes it to the handler),
+        or False if the message has no link
+    """
+    text = message.text
+    if not text or "youtu" not in text:
+        return False
+    match = _YT_RE.search(text)
+    return {"url": match.group(0)} if match else False
+
+def _orjson_dumps(obj) -> str:
+    """json.dumps replacement for the aiogram session; aiogram expects a str."""
+    return orjson.dumps(obj).decode()
 
 class TelegramBot:
     """
@@ -38,29 +356,161 @@ class TelegramBot:
     """
     def __init__(self):
         """Initialize the Telegram bot with all necessary components."""
-        self.bot = Bot(token=TELEGRAM_BOT_TOKEN, parse_mode=ParseMode.MARKDOWN)
+        # orjson parses every incoming update and serializes every API call, much
+        # faster than the standard json module aiogram uses by default
+        session = AiohttpSession(json_loads=orjson.loads, json_dumps=_orjson_dumps)
+        # Retry any API call Telegram answers with 429 after the delay it asks for
+        session.middleware(RetryAfterMiddleware())
+        self.bot = Bot(token=TELEGRAM_BOT_TOKEN, parse_mode=ParseMode.MARKDOWN, session=session)
         self.dp = Dispatcher()
+        # Created here rather than at import so it binds to the running loop
+        self._send_semaphore = asyncio.Semaphore(TELEGRAM_SEND_CONCURRENCY)
+        # Bounds how many videos are downloaded and summarized at once
+        self._job_semaphore = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+        # Paces sends under Telegram's global and per-chat limits to avoid 429s
+        self._rate_limiter = TelegramRateLimiter()
+        self._webhook_stop = asyncio.Event()
+        # Write-behind queue for user saves off the request path
+        self._save_queue: "asyncio.Queue[User]" = asyncio.Queue()
+        self._save_task: Optional[asyncio.Task] = None
+        # Summaries being made right now, by (video ID, model, languages); set when done
+        self._running_videos: Dict[Tuple[str, str, Tuple[str, ...]], asyncio.Event] = {}
         self.user_manager = UserDatabaseManager("data/users.db")
         
         # Try to migrate from old JSON file if it exists
         migrated = self.user_manager.migrate_from_json("data/user_data.json")
         if migrated > 0:
             logger.info(f"Migrated {migrated} users from JSON to database")
-        self.youtube_processor = YouTubeProcessor()
-        self.summarizer = Summarizer()
         self.ai_agent = AIAgent()
         
         # Register handlers
         self.register_handlers()
         
         logger.info("Telegram bot initialized")
+    
+    @cached_property
+    def youtube_processor(self) -> YouTubeProcessor:
+        """YouTube processor, created on first use so startup is not delayed."""
+        return YouTubeProcessor()
+    
+    @cached_property
+    def summarizer(self) -> Summarizer:
+        """Summarizer, created on first use so startup is not delayed."""
+        # Share the bot's agent: one OpenAI client, one cache connection and LRU
+        return Summarizer(self.ai_agent)
 
-    def _setup_bot_commands(self):
-        """Setup bot commands menu (will be called during start)."""
-        pass  # We'll set commands during start method
+    async def _close_sessions(self):
+        """Close HTTP sessions opened by the bot's components."""
+        # Only if the processor was ever created (it is a cached_property)
+        if "youtube_processor" in self.__dict__:
+            await self.youtube_processor.close()
+
+    async def _get_or_create_user(self, user_id: int, **kwargs) -> User:
+        """
+        Get or create a user without blocking the event loop. Users in the
+        in-memory LRU are returned directly; database access runs in a
+        worker thread.
+        
+        Args:
+            user_id: Telegram ID of the user
+            **kwargs: Profile fields for a newly created user
+            
+        Returns:
+            User: The user
+        """
+        user = self.user_manager.get_cached_user(user_id)
+        if user is not None:
+            return user
+        return await asyncio.to_thread(self.user_manager.get_or_create_user, user_id, **kwargs)
+    
+    async def _get_user(self, user_id: int) -> Optional[User]:
+        """
+        Get a user without blocking the event loop (see _get_or_create_user).
+        
+        Args:
+            user_id: Telegram ID of the user
+            
+        Returns:
+            Optional[User]: The user, or None if not found
+        """
+        user = self.user_manager.get_cached_user(user_id)
+        if user is not None:
+            return user
+        return await asyncio.to_thread(self.user_manager.get_user, user_id)
+    
+    async def _save_user(self, user: User):
+        """
+        Save a user in a worker thread, so the database write does not block
+        the event loop.
+        
+        Args:
+            user: User to save
+        """
+        await asyncio.to_thread(self.user_manager.save_user, user)
+    
+    def _queue_save(self, user: User):
+        """
+        Save a user in the background (write-behind). The handler continues
+        at once; _save_worker writes the user together with other pending saves.
+        
+        Args:
+            user: User to save
+        """
+        self._save_queue.put_nowait(user)
+    
+    async def _save_worker(self):
+        """Write users queued by _queue_save, one transaction per batch."""
+        while True:
+            user = await self._save_queue.get()
+            # Coalesce everything queued meanwhile; the last state of each user wins
+            pending = {user.user_id: user}
+            while not self._save_queue.empty():
+                user = self._save_queue.get_nowait()
+                pending[user.user_id] = user
+            
+            try:
+                await asyncio.to_thread(self.user_manager.save_users, list(pending.values()))
+            except Exception as e:
+                logger.error(f"Error saving queued users {list(pending)}: {e}")
+    
+    async def _start_save_worker(self):
+        """Start the write-behind worker (dispatcher startup hook)."""
+        self._save_task = asyncio.create_task(self._save_worker())
+    
+    async def _stop_save_worker(self):
+        """Stop the write-behind worker and write what is still queued (dispatcher shutdown hook)."""
+        if self._save_task is not None:
+            self._save_task.cancel()
+            self._save_task = None
+        
+        pending = {}
+        while not self._save_queue.empty():
+            user = self._save_queue.get_nowait()
+            pending[user.user_id] = user
+        if pending:
+            await asyncio.to_thread(self.user_manager.save_users, list(pending.values()))
+            logger.info(f"Saved {len(pending)} queued users on shutdown")
+    
+    async def _setup_bot_commands(self):
+        """Setup bot commands menu once per run (called by both polling and webhook start)."""
+        try:
+            await self.bot.set_my_commands(_BOT_COMMANDS)
+        except Exception as e:
+            # The menu is cosmetic; polling has its own retries for network problems
+            logger.warning(f"Failed to set bot commands menu: {e}")
 
     def register_handlers(self):
         """Register all message and callback handlers."""
+        # Drop floods from a single user before any filter or database work
+        throttling_middleware = ThrottlingMiddleware(USER_RATE_LIMIT, USER_RATE_BURST)
+        self.dp.message.outer_middleware(throttling_middleware)
+        self.dp.callback_query.outer_middleware(throttling_middleware)
+        
+        # Load the sender once per update and pass it to handlers as `user`
+        user_middleware = UserMiddleware(self._get_or_create_user)
+        self.dp.message.middleware(user_middleware)
+        self.dp.callback_query.middleware(user_middleware)
+        
         # Command handlers with proper aiogram 3.x syntax
         self.dp.message.register(self.cmd_start, Command(commands=["start"]))
         self.dp.message.register(self.cmd_help, Command(commands=["help"]))
@@ -68,21 +518,53 @@ class TelegramBot:
         self.dp.message.register(self.cmd_language, Command(commands=["language"]))
         self.dp.message.register(self.cmd_settings, Command(commands=["settings"]))
         
-        # Button handlers
-        self.dp.message.register(self.cmd_help, lambda msg: msg.text == "❓ Помощь")
-        self.dp.message.register(self.cmd_models, lambda msg: msg.text == "🔄 Выбрать модель")
-        self.dp.message.register(self.cmd_language, lambda msg: msg.text == "🌐 Выбрать язык")
-        self.dp.message.register(self.cmd_settings, lambda msg: msg.text == "⚙️ Настройки")
-        self.dp.message.register(self.list_users, lambda msg: msg.text == "👥 Пользователи")
-        
-        # YouTube link handler
-        self.dp.message.register(
-            self.process_youtube_link, 
-            lambda msg: re.search(YOUTUBE_REGEX, msg.text or "")
-        )
-        
-        # Callback query handler
-        self.dp.callback_query.register(self.callback_handler)
+        # Reply keyboard buttons: one dict lookup selects the handler for a button text
+        self._button_routes = {
+            "❓ Помощь": self.cmd_help,
+            "🔄 Выбрать модель": self.cmd_models,
+            "🌐 Выбрать язык": self.cmd_language,
+            "⚙️ Настройки": self.cmd_settings,
+            "👥 Пользователи": self.list_users
+        }
+        self.dp.message.register(self.route_button, lambda msg: msg.text in self._button_routes)
+        
+        # YouTube link handler; the filter passes the matched link on as `url`
+        self.dp.message.register(self.process_youtube_link, _youtube_link_filter)
+        
+        # Callback query handlers; data is "<action>" or "<action>:<arguments>",
+        # so each handler is selected by the dispatcher from the action part
+        callback_routes = {
+            "set_model": self.handle_set_model,
+            "lang": self.handle_set_language,
+            "settings": self.handle_settings_action,
+            "grant_access": self.handle_grant_access,
+            "reject_access": self.handle_reject_access,
+            "user_info": self.handle_user_info,
+            "user_list": self.handle_user_list_page,
+            "revoke_access": self.handle_revoke_access,
+            "set_user_model": self.handle_set_user_model,
+            "toggle_model_lock": self.handle_toggle_model_lock,
+            "clear_forced_model": self.handle_clear_forced_model,
+            "admin_set_model": self.handle_admin_set_model,
+            "admin_set_model_locked": self.handle_admin_set_model_locked,
+            "lock_user_model": self.handle_lock_user_model,
+            "unlock_user_model": self.handle_unlock_user_model,
+            "admin_set_model_lock": self.handle_admin_set_model_lock
+        }
+        for action, handler in callback_routes.items():
+            self.dp.callback_query.register(handler, F.data.startswith(f"{action}:"))
+        self.dp.callback_query.register(self.handle_back_to_main, F.data == "back_to_main")
+        self.dp.callback_query.register(self.handle_request_access, F.data == "request_access")
+        self.dp.callback_query.register(self.handle_noop, F.data == "noop")
+        self.dp.callback_query.register(self.handle_unknown_callback)
+        
+        # Errors raised by any handler
+        self.dp.errors.register(self.handle_error)
+        
+        # Run when polling or the webhook server starts and stops
+        self.dp.startup.register(self._start_save_worker)
+        self.dp.shutdown.register(self._stop_save_worker)
+        self.dp.shutdown.register(self._close_sessions)
         
         # Default message handler (must be last)
         self.dp.message.register(self.handle_unknown_message)
@@ -92,31 +574,34 @@ class TelegramBot:
     async def start(self):
         """Start the bot polling with improved error handling and retry logic."""
         # Set up bot commands
-        commands = [
-            BotCommand(command="start", description="Запустить бота"),
-            BotCommand(command="help", description="Помощь по использованию"),
-            BotCommand(command="models", description="Выбрать модель"),
-            BotCommand(command="language", description="Выбрать язык"),
-            BotCommand(command="settings", description="Настройки")
-        ]
-        await self.bot.set_my_commands(commands)
+        await self._setup_bot_commands()
         
         max_retries = 5
         retry_delay = 1.0
         retry_count = 0
+        dropped = False
         
         while retry_count < max_retries:
             try:
-                logger.info("Starting bot polling")
+                # start_polling has no drop_pending_updates option; skip old messages
+                # with one request until it succeeds once, so updates that arrive
+                # between later retries are kept
+                if not dropped:
+                    await self.bot.delete_webhook(drop_pending_updates=True)
+                    dropped = True
+                
+                # With a 50s long poll an idle bot makes about one getUpdates call
+                # per minute instead of a constant stream of short requests
+                logger.info(f"Starting bot polling (long polling timeout {POLLING_TIMEOUT}s)")
                 
                 # Configure polling parameters for better stability
                 await self.dp.start_polling(
                     self.bot,
-                    allowed_updates=["message", "callback_query"],  # Only handle messages and callbacks
-                    drop_pending_updates=True,  # Skip old messages on restart
-                    timeout=30,  # 30 second timeout for long polling
-                    backoff_factor=2.0,  # Exponential backoff for retries
-                    max_retries=3  # Internal retries for each request
+                    allowed_updates=self.dp.resolve_used_update_types(),  # Only update types with handlers
+                    handle_signals=False,  # Signals are handled in app.main
+                    handle_as_tasks=True,  # Each update runs in its own task, so slow handlers never block polling
+                    polling_timeout=POLLING_TIMEOUT,  # Telegram holds getUpdates open until an update arrives
+                    backoff_config=BackoffConfig(min_delay=1.0, max_delay=30.0, factor=2.0, jitter=0.1)
                 )
                 
                 # If we get here, polling ended normally
@@ -127,61 +612,104 @@ class TelegramBot:
                 logger.info("Bot stopped by user (KeyboardInterrupt)")
                 break
                 
-            except Exception as e:
-                error_msg = str(e).lower()
+            except TelegramConflictError as e:
+                retry_count += 1
+                logger.warning(f"Conflict error detected (another bot instance running): {e}")
+                if retry_count < max_retries:
+                    logger.info(f"Waiting {retry_delay * 2} seconds for other instance to stop...")
+                    await asyncio.sleep(retry_delay * 2)
+                    retry_delay *= 2  # Increase delay for conflicts
+                continue
+                
+            except TelegramNetworkError as e:
                 retry_count += 1
+                logger.warning(f"Network error (attempt {retry_count}/{max_retries}): {e}")
+                if retry_count < max_retries:
+                    logger.info(f"Retrying in {retry_delay} seconds...")
+                    await asyncio.sleep(retry_delay)
+                    retry_delay = min(retry_delay * 1.5, 30)  # Cap delay at 30 seconds
+                continue
                 
-                # Handle specific error types
-                if "conflict" in error_msg and "getupdates" in error_msg:
-                    logger.warning(f"Conflict error detected (another bot instance running): {e}")
-                    if retry_count < max_retries:
-                        logger.info(f"Waiting {retry_delay * 2} seconds for other instance to stop...")
-                        await asyncio.sleep(retry_delay * 2)
-                        retry_delay *= 2  # Increase delay for conflicts
-                    continue
-                    
-                elif any(network_error in error_msg for network_error in [
-                    "connection reset", "connection timeout", "network", 
-                    "server disconnected", "timeout", "clientoserror"
-                ]):
-                    logger.warning(f"Network error (attempt {retry_count}/{max_retries}): {e}")
-                    if retry_count < max_retries:
-                        logger.info(f"Retrying in {retry_delay} seconds...")
-                        await asyncio.sleep(retry_delay)
-                        retry_delay = min(retry_delay * 1.5, 30)  # Cap delay at 30 seconds
-                    continue
-                    
-                else:
-                    # For other errors, log and retry with shorter delay
-                    logger.error(f"Unexpected error (attempt {retry_count}/{max_retries}): {e}")
-                    if retry_count < max_retries:
-                        logger.info(f"Retrying in {min(retry_delay, 5)} seconds...")
-                        await asyncio.sleep(min(retry_delay, 5))
-                    continue
+            except Exception as e:
+                # For other errors, log and retry with shorter delay
+                retry_count += 1
+                logger.error(f"Unexpected error (attempt {retry_count}/{max_retries}): {e}")
+                if retry_count < max_retries:
+                    logger.info(f"Retrying in {min(retry_delay, 5)} seconds...")
+                    await asyncio.sleep(min(retry_delay, 5))
+                continue
         
         if retry_count >= max_retries:
             logger.critical(f"Failed to start bot after {max_retries} attempts")
             raise Exception(f"Bot failed to start after {max_retries} retry attempts")
     
-    async def cmd_start(self, message: Message):
+    async def start_webhook(self):
+        """
+        Serve updates pushed by Telegram to an aiohttp webhook endpoint
+        instead of polling for them. Runs until shutdown() is called.
+        """
+        await self._setup_bot_commands()
+        
+        app = web.Application()
+        # Answer Telegram right away and process the update in a background task
+        SimpleRequestHandler(
+            dispatcher=self.dp,
+            bot=self.bot,
+            handle_in_background=True,
+            secret_token=WEBHOOK_SECRET
+        ).register(app, path=WEBHOOK_PATH)
+        setup_application(app, self.dp, bot=self.bot)
+        
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+        
+        try:
+            await self.bot.set_webhook(
+                url=f"{WEBHOOK_URL.rstrip('/')}{WEBHOOK_PATH}",
+                allowed_updates=self.dp.resolve_used_update_types(),  # Only update types with handlers
+                drop_pending_updates=True,  # Skip old messages on restart
+                max_connections=WEBHOOK_MAX_CONNECTIONS,
+                secret_token=WEBHOOK_SECRET
+            )
+            logger.info(f"Webhook server listening on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+            await self._webhook_stop.wait()
+        finally:
+            # Shuts down the dispatcher and closes the bot session
+            await runner.cleanup()
+            logger.info("Webhook server stopped")
+    
+    async def shutdown(self):
+        """Stop polling; start_polling closes the bot session on its way out."""
+        if BOT_MODE == "webhook":
+            self._webhook_stop.set()
+            return
+        
+        try:
+            await self.dp.stop_polling()
+        except RuntimeError:
+            # Polling is not running (e.g. waiting between restart attempts)
+            logger.info("Polling is not running, nothing to stop")
+    
+    async def route_button(self, message: Message, user: User):
+        """
+        Handle a reply keyboard button by calling the handler for its text.
+        
+        Args:
+            message: Telegram message with the button text
+            user: Sender, loaded by UserMiddleware
+        """
+        await self._button_routes[message.text](message, user)
+    
+    async def cmd_start(self, message: Message, user: User):
         """
         Handle /start command.
         
         Args:
             message: Telegram message with the command
+            user: Sender, loaded by UserMiddleware
         """
-        user_id = message.from_user.id
-        username = message.from_user.username or ""
-        first_name = message.from_user.first_name or ""
-        last_name = message.from_user.last_name or ""
-        
-        # Get or create user
-        user = self.user_manager.get_or_create_user(
-            user_id=user_id,
-            username=username,
-            first_name=first_name,
-            last_name=last_name
-        )
+        user_id = user.user_id
         
         logger.info(f"User {user.display_name} (ID: {user_id}) started the bot")
         
@@ -189,15 +717,10 @@ class TelegramBot:
         if user.has_access():
             # User has access, show main menu
             keyboard = create_admin_keyboard() if user.is_admin else create_main_keyboard()
-            welcome_message = f"👋 Привет, {user.display_name}!\n\n"
-            
-            if user.is_admin:
-                welcome_message += "🔧 *Административная панель*\n\n"
-            
-            welcome_message += (
-                "🎥 Я помогу вам создать краткое содержание любого YouTube видео!\n\n"
-                "📎 Просто отправьте мне ссылку на YouTube видео, и я проанализирую его содержание.\n\n"
-                "⚙️ Используйте кнопки ниже для настройки бота."
+            welcome_message = (
+                f"👋 Привет, {_escape_markdown(user.display_name)}!\n\n"
+                f"{_ADMIN_PANEL_HEADER if user.is_admin else ''}"
+                f"{_WELCOME_BODY}"
             )
             
             await message.answer(welcome_message, reply_markup=keyboard)
@@ -208,7 +731,7 @@ class TelegramBot:
     async def show_access_request(self, message: Message, user):
         """Show access request interface to user."""
         access_message = (
-            f"👋 Привет, {user.display_name}!\n\n"
+            f"👋 Привет, {_escape_markdown(user.display_name)}!\n\n"
             "🔒 Для использования бота необходимо получить доступ.\n\n"
             "📝 Нажмите кнопку ниже, чтобы отправить запрос администратору."
         )
@@ -216,64 +739,30 @@ class TelegramBot:
         keyboard = create_access_request_keyboard()
         await message.answer(access_message, reply_markup=keyboard)
 
-    async def cmd_help(self, message: Message):
+    async def cmd_help(self, message: Message, user: User):
         """
         Handle /help command and help button.
         
         Args:
             message: Telegram message with the command
+            user: Sender, loaded by UserMiddleware
         """
-        user_id = message.from_user.id
-        user = self.user_manager.get_or_create_user(user_id=user_id)
+        user_id = user.user_id
         
         logger.info(f"User {user.display_name} (ID: {user_id}) requested help")
         
-        help_text = (
-            "📖 *Руководство по использованию бота*\n\n"
-            "🎥 *Основная функция:*\n"
-            "Отправьте ссылку на YouTube видео, и бот создаст его краткое содержание\n\n"
-            "🔧 *Доступные команды:*\n"
-            "• /start - Запустить бота\n"
-            "• /help - Показать эту справку\n"
-            "• /models - Выбрать модель ИИ\n"
-            "• /language - Выбрать язык субтитров\n"
-            "• /settings - Настройки бота\n\n"
-            "⚙️ *Кнопки управления:*\n"
-            "• 🔄 Выбрать модель - изменить модель ИИ\n"
-            "• 🌐 Выбрать язык - настроить языки субтитров\n"
-            "• ⚙️ Настройки - дополнительные опции\n\n"
-        )
-        
-        if user.is_admin:
-            help_text += (
-                "👑 *Административные функции:*\n"
-                "• 👥 Пользователи - управление пользователями\n"
-                "• Одобрение запросов доступа\n"
-                "• Управление лимитами пользователей\n\n"
-            )
-        
-        help_text += (
-            "📝 *Поддерживаемые форматы ссылок:*\n"
-            "• youtube.com/watch?v=...\n"
-            "• youtu.be/...\n"
-            "• youtube.com/shorts/...\n\n"
-            "💡 *Совет:* Бот работает лучше всего с видео, у которых есть субтитры на русском или английском языке."
-        )
-        
-        await message.answer(help_text)
+        await message.answer(_HELP_TEXT_ADMIN if user.is_admin else _HELP_TEXT_USER)
 
-    async def cmd_models(self, message: Message):
+    async def cmd_models(self, message: Message, user: User):
         """
         Handle /models command and models button.
         
         Args:
             message: Telegram message with the command
+            user: Sender, loaded by UserMiddleware
         """
-        user_id = message.from_user.id
-        user = self.user_manager.get_or_create_user(user_id=user_id)
-        
         if not user.has_access():
-            await message.answer("⛔ У вас нет доступа к этой функции.")
+            await message.answer("⛔ У вас нет доступа к этой функции.", parse_mode=None)
             return
         
         try:
@@ -316,20 +805,18 @@ class TelegramBot:
             
         except Exception as e:
             logger.error(f"Error getting models: {e}")
-            await message.answer("❌ Ошибка при получении списка моделей.")
+            await message.answer("❌ Ошибка при получении списка моделей.", parse_mode=None)
 
-    async def cmd_language(self, message: Message):
+    async def cmd_language(self, message: Message, user: User):
         """
         Handle /language command and language button.
         
         Args:
             message: Telegram message with the command
+            user: Sender, loaded by UserMiddleware
         """
-        user_id = message.from_user.id
-        user = self.user_manager.get_or_create_user(user_id=user_id)
-        
         if not user.has_access():
-            await message.answer("⛔ У вас нет доступа к этой функции.")
+            await message.answer("⛔ У вас нет доступа к этой функции.", parse_mode=None)
             return
         
         keyboard = create_language_keyboard()
@@ -350,18 +837,16 @@ class TelegramBot:
         
         await message.answer(language_text, reply_markup=keyboard)
 
-    async def cmd_settings(self, message: Message):
+    async def cmd_settings(self, message: Message, user: User):
         """
         Handle /settings command and settings button.
         
         Args:
             message: Telegram message with the command
+            user: Sender, loaded by UserMiddleware
         """
-        user_id = message.from_user.id
-        user = self.user_manager.get_or_create_user(user_id=user_id)
-        
         if not user.has_access():
-            await message.answer("⛔ У вас нет доступа к этой функции.")
+            await message.answer("⛔ У вас нет доступа к этой функции.", parse_mode=None)
             return
         
         keyboard = create_settings_keyboard()
@@ -371,7 +856,7 @@ class TelegramBot:
         
         settings_text = (
             "⚙️ *Настройки пользователя*\n\n"
-            f"👤 *Пользователь:* {user.display_name}\n"
+            f"👤 *Пользователь:* {_escape_markdown(user.display_name)}\n"
             f"🤖 *Модель:* {user.model or 'По умолчанию'}\n"
             f"🌐 *Языки:* {', '.join(user.languages)}\n"
             f"📊 *Осталось запросов:* {remaining}\n"
@@ -381,106 +866,72 @@ class TelegramBot:
         
         await message.answer(settings_text, reply_markup=keyboard)
 
-    async def list_users(self, message: types.Message):
+    async def list_users(self, message: types.Message, user: User):
         """
         Shows a list of all users to admin users.
         
         Args:
             message: Telegram message with the button press
+            user: Sender, loaded by UserMiddleware
         """
-        user_id = message.from_user.id
-        user = self.user_manager.get_or_create_user(user_id=user_id)
+        user_id = user.user_id
         
         # Only admins can access this
         if not user.is_admin:
             logger.warning(f"Non-admin user {user.display_name} (ID: {user_id}) tried to access user list")
-            await message.answer("⛔ У вас нет доступа к этой функции.")
+            await message.answer("⛔ У вас нет доступа к этой функции.", parse_mode=None)
             return
         
         logger.info(f"Admin {user.display_name} (ID: {user_id}) requested user list")
         
-        # Get all users except the current admin
-        all_users = self.user_manager.get_all_users()
-        users = [u for u in all_users if u.user_id != user_id]
+        # Load the first page of users except the current admin
+        users, total = await asyncio.to_thread(
+            self.user_manager.get_users_page, 0, USERS_PAGE_SIZE, user_id
+        )
         
-        if not users:
-            await message.answer("👥 Нет зарегистрированных пользователей.")
+        if not total:
+            await message.answer("👥 Нет зарегистрированных пользователей.", parse_mode=None)
             return
         
         # Create keyboard with user objects
-        keyboard = create_user_list_keyboard(users)
+        keyboard = create_user_list_keyboard(users, total)
         
         # Send user list message
         await message.answer(
-            f"👥 Список пользователей ({len(users)}):\n\n"
+            f"👥 Список пользователей ({total}):\n\n"
             f"Выберите пользователя для управления:",
             reply_markup=keyboard
         )
     
-    async def callback_handler(self, callback: CallbackQuery):
+    async def handle_unknown_callback(self, callback: CallbackQuery, user: User):
         """
-        Handle callback queries from inline keyboards.
+        Handle callback data that no registered handler matched.
         
         Args:
             callback: Callback query from inline keyboard
+            user: Sender, loaded by UserMiddleware
         """
-        # Get user
-        user_id = callback.from_user.id
-        user = self.user_manager.get_or_create_user(user_id=user_id)
-        
-        # Extract callback data
-        data = callback.data
-        
-        logger.info(f"Callback from user {user.display_name} (ID: {user_id}): {data}")
+        logger.warning(f"Unknown callback data from user {user.display_name} (ID: {user.user_id}): {callback.data}")
+        await callback.answer("❌ Неизвестная команда")
+
+    async def handle_error(self, event: ErrorEvent):
+        """
+        Log an exception raised by a handler and tell the user about it.
         
-        try:
-            # Handle different callback types
-            if data.startswith("set_model:"):
-                await self.handle_set_model(callback, user)
-            elif data.startswith("lang:"):
-                await self.handle_set_language(callback, user)
-            elif data.startswith("settings:"):
-                await self.handle_settings_action(callback, user)
-            elif data == "back_to_main":
-                await self.handle_back_to_main(callback, user)
-            elif data == "request_access":
-                await self.handle_request_access(callback, user)
-            elif data.startswith("grant_access:"):
-                await self.handle_grant_access(callback, user)
-            elif data.startswith("reject_access:"):
-                await self.handle_reject_access(callback, user)
-            elif data.startswith("user_info:"):
-                await self.handle_user_info(callback, user)
-            elif data.startswith("user_list:"):
-                await self.handle_user_list_page(callback, user)
-            elif data.startswith("revoke_access:"):
-                await self.handle_revoke_access(callback, user)
-            elif data.startswith("set_user_model:"):
-                await self.handle_set_user_model(callback, user)
-            elif data.startswith("toggle_model_lock:"):
-                await self.handle_toggle_model_lock(callback, user)
-            elif data.startswith("clear_forced_model:"):
-                await self.handle_clear_forced_model(callback, user)
-            elif data.startswith("admin_set_model:"):
-                await self.handle_admin_set_model(callback, user)
-            elif data.startswith("admin_set_model_locked:"):
-                await self.handle_admin_set_model_locked(callback, user)
-            elif data.startswith("lock_user_model:"):
-                await self.handle_lock_user_model(callback, user)
-            elif data.startswith("unlock_user_model:"):
-                await self.handle_unlock_user_model(callback, user)
-            elif data.startswith("admin_set_model_lock:"):
-                await self.handle_admin_set_model_lock(callback, user)
-            elif data == "noop":
-                # No operation - for pagination indicators
-                await callback.answer()
-            else:
-                logger.warning(f"Unknown callback data: {data}")
-                await callback.answer("❌ Неизвестная команда")
-                
-        except Exception as e:
-            logger.error(f"Error handling callback {data}: {e}")
-            await callback.answer("❌ Произошла ошибка")
+        Args:
+            event: Failed update and the exception it raised
+        """
+        update = event.update
+        logger.error(f"Error handling update {update.update_id}: {event.exception}")
+        if update.callback_query:
+            try:
+                await update.callback_query.answer("❌ Произошла ошибка")
+            except Exception as e:
+                logger.warning(f"Failed to answer callback {update.callback_query.id}: {e}")
+
+    async def handle_noop(self, callback: CallbackQuery, user):
+        """Handle buttons without an action (e.g. pagination indicators)."""
+        await callback.answer()
 
     async def handle_set_model(self, callback: CallbackQuery, user):
         """Handle model selection callback."""
@@ -494,7 +945,7 @@ class TelegramBot:
         
         # Update user model
         user.model = model
-        self.user_manager.save_user(user)
+        await self._save_user(user)
         
         logger.info(f"User {user.display_name} (ID: {user.user_id}) changed model to {model}")
         
@@ -511,8 +962,9 @@ class TelegramBot:
                 f"Модель успешно изменена!",
                 reply_markup=keyboard
             )
-        except:
-            pass
+        except TelegramAPIError as e:
+            # The model is already saved and confirmed; only the menu refresh failed
+            logger.warning(f"Failed to update model menu for user {user.user_id}: {e}")
 
     async def handle_set_language(self, callback: CallbackQuery, user):
         """Handle language selection callback."""
@@ -521,7 +973,7 @@ class TelegramBot:
         
         # Update user languages
         user.languages = languages
-        self.user_manager.save_user(user)
+        await self._save_user(user)
         
         logger.info(f"User {user.display_name} (ID: {user.user_id}) changed languages to {languages}")
         
@@ -544,7 +996,7 @@ class TelegramBot:
             # Reset user settings to default
             user.model = None
             user.languages = ['ru', 'en']
-            self.user_manager.save_user(user)
+            await self._save_user(user)
             
             await callback.answer("✅ Настройки сброшены")
             await callback.message.edit_text(
@@ -553,22 +1005,7 @@ class TelegramBot:
             )
             
         elif action == "about":
-            about_text = (
-                "ℹ️ *О боте YouTube Summarizer*\n\n"
-                "🎯 *Назначение:*\n"
-                "Создание кратких аналитических обзоров YouTube видео\n\n"
-                "🔧 *Технологии:*\n"
-                "• OpenAI GPT для анализа\n"
-                "• YouTube Transcript API для субтитров\n"
-                "• Aiogram для Telegram интеграции\n\n"
-                "📊 *Возможности:*\n"
-                "• Поддержка нескольких языков\n"
-                "• Выбор различных моделей ИИ\n"
-                "• Структурированный анализ контента\n\n"
-                "👨‍💻 *Разработка:* 2024"
-            )
-            
-            await callback.message.edit_text(about_text)
+            await callback.message.edit_text(_ABOUT_TEXT)
 
     async def handle_back_to_main(self, callback: CallbackQuery, user):
         """Handle back to main menu action."""
@@ -576,48 +1013,40 @@ class TelegramBot:
         
         keyboard = create_admin_keyboard() if user.is_admin else create_main_keyboard()
         
-        welcome_text = f"👋 Главное меню\n\n"
-        if user.is_admin:
-            welcome_text += "🔧 *Административная панель*\n\n"
-        
-        welcome_text += "Выберите действие:"
-        
-        await callback.message.edit_text(welcome_text, reply_markup=keyboard)
+        await callback.message.edit_text(
+            _MAIN_MENU_TEXT_ADMIN if user.is_admin else _MAIN_MENU_TEXT_USER,
+            reply_markup=keyboard
+        )
 
     async def handle_request_access(self, callback: CallbackQuery, user):
         """Handle access request from user."""
         await callback.answer("📨 Запрос отправлен администратору")
         
-        # Send notification to all admins
-        admins = self.user_manager.get_admin_users()
-        
-        for admin in admins:
-            try:
-                # Generate admin notification
-                user_data = {
-                    "user_id": user.user_id,
-                    "user_name": user.display_name,
-                    "username": user.username or "Не указан",
-                    "request_date": datetime.now().strftime("%d.%m.%Y %H:%M")
-                }
-                
-                notification_text = await self.ai_agent.generate_admin_notification(user_data)
-                keyboard = create_admin_notification_keyboard(user.user_id)
-                
-                await self.bot.send_message(
-                    admin.user_id,
-                    notification_text,
-                    reply_markup=keyboard
-                )
-                
-            except Exception as e:
-                logger.error(f"Failed to send notification to admin {admin.user_id}: {e}")
-        
-        # Update user message
-        await callback.message.edit_text(
-            "📨 *Запрос отправлен*\n\n"
-            "Ваш запрос на доступ отправлен администратору.\n"
-            "Ожидайте одобрения."
+        # Names are escaped up front: they end up in a Markdown message both
+        # via the model's text and via the fixed fallback notification
+        user_data = {
+            "user_id": user.user_id,
+            "user_name": _escape_markdown(user.display_name),
+            "username": _escape_markdown(user.username) if user.username else "Не указан",
+            "request_date": datetime.now().strftime("%d.%m.%Y %H:%M")
+        }
+        
+        # The notification is the same for every admin: generate it once,
+        # while the admin list is loaded
+        admins, notification_text = await asyncio.gather(
+            asyncio.to_thread(self.user_manager.get_admin_users),
+            self.ai_agent.generate_admin_notification(user_data)
+        )
+        keyboard = create_admin_notification_keyboard(user.user_id)
+        
+        # Notify all admins and update the user's message concurrently
+        await asyncio.gather(
+            *(self._notify_user(admin.user_id, notification_text, reply_markup=keyboard) for admin in admins),
+            callback.message.edit_text(
+                "📨 *Запрос отправлен*\n\n"
+                "Ваш запрос на доступ отправлен администратору.\n"
+                "Ожидайте одобрения."
+            )
         )
 
     async def handle_grant_access(self, callback: CallbackQuery, user):
@@ -631,35 +1060,30 @@ class TelegramBot:
             target_user_id = int(target_user_id_str)
             requests = int(requests_str)
             
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
                 return
             
             # Grant access
             target_user.grant_access(requests)
-            self.user_manager.save_user(target_user)
+            await self._save_user(target_user)
             
-            # Notify admin
+            # Notify admin, update admin message and notify user concurrently
             requests_text = "безлимитный доступ" if requests == -1 else f"{requests} запросов"
-            await callback.answer(f"✅ Доступ предоставлен: {requests_text}")
-            
-            # Update admin message
-            await callback.message.edit_text(
-                f"✅ *Доступ предоставлен*\n\n"
-                f"Пользователь {target_user.display_name} получил {requests_text}."
-            )
-            
-            # Notify user about approved access
-            try:
-                await self.bot.send_message(
+            await asyncio.gather(
+                callback.answer(f"✅ Доступ предоставлен: {requests_text}"),
+                callback.message.edit_text(
+                    f"✅ *Доступ предоставлен*\n\n"
+                    f"Пользователь {_escape_markdown(target_user.display_name)} получил {requests_text}."
+                ),
+                self._notify_user(
                     target_user_id,
                     f"🎉 *Доступ одобрен!*\n\n"
                     f"Вам предоставлен {requests_text}.\n"
                     f"Теперь вы можете пользоваться ботом!"
                 )
-            except:
-                pass
+            )
             
             logger.info(f"Admin {user.display_name} granted access to user {target_user.display_name} ({requests} requests)")
             
@@ -667,6 +1091,27 @@ class TelegramBot:
             logger.error(f"Error granting access: {e}")
             await callback.answer("❌ Ошибка при предоставлении доступа")
 
+    async def _notify_user(self, user_id: int, text: str, reply_markup=None):
+        """
+        Send a notification to a user; delivery failures (e.g. the user
+        blocked the bot) are logged rather than raised. Text that Telegram
+        cannot parse as Markdown is resent as plain text.
+        
+        Args:
+            user_id: Telegram ID of the user
+            text: Notification text
+            reply_markup: Optional keyboard to attach
+        """
+        try:
+            await self._rate_limiter.wait(user_id)
+            try:
+                await self.bot.send_message(user_id, text, reply_markup=reply_markup)
+            except TelegramBadRequest as e:
+                logger.warning(f"Markdown rejected for notification to user {user_id}, sending plain text: {e}")
+                await self.bot.send_message(user_id, text, reply_markup=reply_markup, parse_mode=None)
+        except Exception as e:
+            logger.warning(f"Could not notify user {user_id}: {e}")
+
     async def handle_reject_access(self, callback: CallbackQuery, user):
         """Handle admin rejecting access request."""
         if not user.is_admin:
@@ -675,29 +1120,25 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
                 return
             
-            await callback.answer("❌ Запрос отклонен")
-            
-            # Update admin message
-            await callback.message.edit_text(
-                f"❌ *Запрос отклонен*\n\n"
-                f"Запрос пользователя {target_user.display_name} был отклонен."
-            )
-            
-            # Notify user about rejection
-            try:
-                await self.bot.send_message(
+            # Answer admin, update admin message and notify user concurrently
+            await asyncio.gather(
+                callback.answer("❌ Запрос отклонен"),
+                callback.message.edit_text(
+                    f"❌ *Запрос отклонен*\n\n"
+                    f"Запрос пользователя {_escape_markdown(target_user.display_name)} был отклонен."
+                ),
+                self._notify_user(
                     target_user_id,
                     "❌ *Запрос отклонен*\n\n"
                     "К сожалению, ваш запрос на доступ к боту был отклонен администратором."
                 )
-            except:
-                pass
+            )
             
             logger.info(f"Admin {user.display_name} rejected access for user {target_user.display_name}")
             
@@ -713,7 +1154,7 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -732,8 +1173,8 @@ class TelegramBot:
             user_info_text = (
                 f"👤 *Информация о пользователе*\n\n"
                 f"**ID:** {target_user.user_id}\n"
-                f"**Имя:** {target_user.display_name}\n"
-                f"**Username:** @{target_user.username or 'Не указан'}\n"
+                f"**Имя:** {_escape_markdown(target_user.display_name)}\n"
+                f"**Username:** {_escape_markdown('@' + target_user.username) if target_user.username else 'Не указан'}\n"
                 f"**Статус:** {status}\n"
                 f"**Админ:** {'Да' if target_user.is_admin else 'Нет'}\n\n"
                 f"🤖 **Модели:**\n"
@@ -763,14 +1204,15 @@ class TelegramBot:
         try:
             page = int(callback.data.split(":", 1)[1])
             
-            # Get all users except current admin
-            all_users = self.user_manager.get_all_users()
-            users = [u for u in all_users if u.user_id != user.user_id]
+            # Load only this page of users except current admin
+            users, total = await asyncio.to_thread(
+                self.user_manager.get_users_page, page * USERS_PAGE_SIZE, USERS_PAGE_SIZE, user.user_id
+            )
             
-            keyboard = create_user_list_keyboard(users, page)
+            keyboard = create_user_list_keyboard(users, total, page)
             
             await callback.message.edit_text(
-                f"👥 Список пользователей ({len(users)}):\n\n"
+                f"👥 Список пользователей ({total}):\n\n"
                 f"Выберите пользователя для управления:",
                 reply_markup=keyboard
             )
@@ -787,7 +1229,7 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -795,19 +1237,17 @@ class TelegramBot:
             
             # Revoke access
             target_user.revoke_access()
-            self.user_manager.save_user(target_user)
-            
-            await callback.answer("✅ Доступ отозван")
+            await self._save_user(target_user)
             
-            # Notify user
-            try:
-                await self.bot.send_message(
+            # Answer admin and notify user concurrently
+            await asyncio.gather(
+                callback.answer("✅ Доступ отозван"),
+                self._notify_user(
                     target_user_id,
                     "🚫 *Доступ отозван*\n\n"
                     "Ваш доступ к боту был отозван администратором."
                 )
-            except:
-                pass
+            )
             
             logger.info(f"Admin {user.display_name} revoked access for user {target_user.display_name}")
             
@@ -823,7 +1263,7 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -838,7 +1278,7 @@ class TelegramBot:
             
             text = (
                 f"🤖 *Управление моделью пользователя*\n\n"
-                f"**Пользователь:** {target_user.display_name}\n"
+                f"**Пользователь:** {_escape_markdown(target_user.display_name)}\n"
                 f"**Текущая модель:** {current_model}\n"
                 f"**Принудительная модель:** {target_user.forced_model or 'Не установлена'}\n"
                 f"**Блокировка:** {lock_status}\n\n"
@@ -859,7 +1299,7 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -870,7 +1310,7 @@ class TelegramBot:
             
             text = (
                 f"🔐 *Управление блокировкой модели*\n\n"
-                f"**Пользователь:** {target_user.display_name}\n"
+                f"**Пользователь:** {_escape_markdown(target_user.display_name)}\n"
                 f"**Текущий статус:** {lock_status}\n"
                 f"**Принудительная модель:** {target_user.forced_model or 'Не установлена'}\n\n"
                 f"Выберите действие:"
@@ -890,7 +1330,7 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -898,7 +1338,7 @@ class TelegramBot:
             
             # Clear forced model
             target_user.set_forced_model(None, False)
-            self.user_manager.save_user(target_user)
+            await self._save_user(target_user)
             
             await callback.answer("✅ Принудительная модель сброшена")
             
@@ -922,7 +1362,7 @@ class TelegramBot:
             target_user_id = int(parts[1])
             model = parts[2]
             
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -930,7 +1370,7 @@ class TelegramBot:
             
             # Set forced model without locking
             target_user.set_forced_model(model, target_user.is_model_locked)
-            self.user_manager.save_user(target_user)
+            await self._save_user(target_user)
             
             await callback.answer(f"✅ Модель {model} установлена")
             
@@ -964,7 +1404,7 @@ class TelegramBot:
                 for j in range(2):
                     if i + j < len(models):
                         model = models[i + j]
-                        display_name = model.replace("gpt-", "GPT-").replace("-", " ").title()
+                        display_name = model_display_name(model)
                         
                         button = types.InlineKeyboardButton(
                             text=f"🔒 {display_name}",
@@ -1004,7 +1444,7 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -1013,7 +1453,7 @@ class TelegramBot:
             # Lock model changes
             target_user.is_model_locked = True
             target_user.updated_at = datetime.now()
-            self.user_manager.save_user(target_user)
+            await self._save_user(target_user)
             
             await callback.answer("🔒 Смена модели заблокирована")
             
@@ -1034,7 +1474,7 @@ class TelegramBot:
         
         try:
             target_user_id = int(callback.data.split(":", 1)[1])
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -1043,7 +1483,7 @@ class TelegramBot:
             # Unlock model changes
             target_user.is_model_locked = False
             target_user.updated_at = datetime.now()
-            self.user_manager.save_user(target_user)
+            await self._save_user(target_user)
             
             await callback.answer("🔓 Смена модели разблокирована")
             
@@ -1067,7 +1507,7 @@ class TelegramBot:
             target_user_id = int(parts[1])
             model = parts[2]
             
-            target_user = self.user_manager.get_user(target_user_id)
+            target_user = await self._get_user(target_user_id)
             
             if not target_user:
                 await callback.answer("❌ Пользователь не найден")
@@ -1075,7 +1515,7 @@ class TelegramBot:
             
             # Set forced model with lock
             target_user.set_forced_model(model, True)
-            self.user_manager.save_user(target_user)
+            await self._save_user(target_user)
             
             await callback.answer(f"🔒 Модель {model} установлена и заблокирована")
             
@@ -1088,72 +1528,74 @@ class TelegramBot:
             logger.error(f"Error setting locked model: {e}")
             await callback.answer("❌ Ошибка при установке заблокированной модели")
 
-    async def process_youtube_link(self, message: Message):
+    async def process_youtube_link(self, message: Message, user: User, url: str):
         """
         Process YouTube link sent by user.
         
         Args:
             message: Telegram message containing YouTube link
+            user: Sender, loaded by UserMiddleware
+            url: The link, matched by _youtube_link_filter
         """
-        user_id = message.from_user.id
-        user = self.user_manager.get_or_create_user(
-            user_id=user_id,
-            username=message.from_user.username,
-            first_name=message.from_user.first_name,
-            last_name=message.from_user.last_name
-        )
+        user_id = user.user_id
         
         # Check if user has access
         if not user.has_access():
-            await message.answer("⛔ У вас нет доступа к обработке видео. Запросите доступ у администратора.")
+            await message.answer("⛔ У вас нет доступа к обработке видео. Запросите доступ у администратора.", parse_mode=None)
             return
         
         # Check if user has remaining requests
         if not user.use_request():
-            await message.answer("❌ У вас закончились запросы. Обратитесь к администратору.")
+            await message.answer("❌ У вас закончились запросы. Обратитесь к администратору.", parse_mode=None)
             return
         
-        # Save user after using request
-        self.user_manager.save_user(user)
-        
-        url = message.text.strip()
+        # Save user after using request, without waiting for the write
+        self._queue_save(user)
         
-        logger.info(f"User {user.display_name} (ID: {user_id}) sent YouTube link: {url}")
-        effective_model = user.get_effective_model() or 'default'
-        logger.info(f"Using model {effective_model} and languages {user.languages} for user {user_id}")
+        # Lazy: nothing is formatted or computed when INFO is filtered out
+        logger.opt(lazy=True).info(
+            "User {} (ID: {}) sent YouTube link: {} (model {}, languages {})",
+            lambda: user.display_name, lambda: user_id, lambda: url,
+            lambda: user.get_effective_model() or 'default', lambda: user.languages
+        )
         
-        # Send "processing" message
-        processing_msg = await message.answer("🔄 Обрабатываю видео, это может занять некоторое время...")
+        # Send "processing" message; fixed texts without formatting skip Markdown parsing
+        processing_msg = await message.answer("🔄 Обрабатываю видео, это может занять некоторое время...", parse_mode=None)
         
         try:
-            # Process the video
-            video_title, transcript = await self.youtube_processor.process_video(url, user.languages)
-            
-            if not video_title or not transcript:
-                # Generate error response
-                error_response = await self.ai_agent.generate_error_response(url, user.get_effective_model())
-                await processing_msg.edit_text(error_response)
+            footer = f"🔗 [Ссылка на видео]({url})"
+            model = user.get_effective_model() or self.summarizer.model
+            
+            # The same video, model and languages always give the same summary:
+            # answer from the cache without fetching the transcript or calling OpenAI
+            video_id = await self.youtube_processor.extract_video_id(url)
+            cached_summary = await self.ai_agent.get_video_summary(video_id, model, user.languages)
+            
+            # The same summary is already being made for another request: wait
+            # for it and answer from the cache instead of doing the work twice.
+            # If that run failed, another waiter may have taken over by the time
+            # this one wakes, so check again until nothing is running
+            key = (video_id, model, tuple(user.languages))
+            running = self._running_videos.get(key)
+            while not cached_summary and running is not None:
+                logger.info(f"Waiting for running summary of video {video_id} for user {user_id}")
+                await running.wait()
+                cached_summary = await self.ai_agent.get_video_summary(video_id, model, user.languages)
+                running = self._running_videos.get(key)
+            
+            if cached_summary:
+                logger.info(f"Returning cached summary of video {video_id} for user {user_id}")
+                await self._send_parts(processing_msg, split_message(f"{cached_summary}\n\n{footer}"))
                 return
             
-            # Generate summary
-            summary = await self.summarizer.summarize(
-                text=transcript,
-                title=video_title,
-                model=user.get_effective_model()
-            )
-            
-            if not summary:
-                await processing_msg.edit_text("❌ Не удалось создать анализ видео.")
-                return
-            
-            # Format final response
-            final_response = (
-                f"{summary}\n\n"
-                f"🔗 [Ссылка на видео]({url})"
-            )
-            
-            # Edit the processing message with results
-            await processing_msg.edit_text(final_response, disable_web_page_preview=True)
+            done = self._running_videos[key] = asyncio.Event()
+            try:
+                if not await self._summarize_video(processing_msg, user, url, video_id, model, footer):
+                    return
+            finally:
+                if self._running_videos.get(key) is done:
+                    del self._running_videos[key]
+                done.set()
             
             logger.info(f"Successfully processed video for user {user_id}")
             
@@ -1164,21 +1606,227 @@ class TelegramBot:
             try:
                 error_response = await self.ai_agent.generate_error_response(url, user.get_effective_model())
                 await processing_msg.edit_text(error_response)
-            except:
-                await processing_msg.edit_text(
-                    "❌ Произошла ошибка при обработке видео. "
-                    "Пожалуйста, проверьте ссылку и попробуйте снова."
-                )
+            except TelegramAPIError as e:
+                # Typically generated text that is not valid Markdown; fall back to a fixed plain message
+                logger.warning(f"Failed to send error response to user {user_id}: {e}")
+                await processing_msg.edit_text(_PROCESSING_ERROR_TEXT, parse_mode=None)
+
+    async def _summarize_video(self, processing_msg: Message, user: User, url: str,
+                               video_id: str, model: str, footer: str) -> bool:
+        """
+        Fetch a video's transcript and stream its summary into the processing message.
+        
+        Args:
+            processing_msg: Bot message to show the summary in
+            user: User who sent the link
+            url: YouTube video URL
+            video_id: YouTube video ID
+            model: Model to summarize with
+            footer: Text appended after the summary
+            
+        Returns:
+            bool: True if the summary was sent, False if an error was shown instead
+        """
+        # Transcript download and summarization are limited to MAX_CONCURRENT_JOBS
+        # at a time; further videos wait for a free slot
+        if self._job_semaphore.locked():
+            await processing_msg.edit_text("⏳ Видео в очереди на обработку, подождите немного...", parse_mode=None)
+        
+        async with self._job_semaphore:
+            # Process the video
+            video_title, transcript = await self.youtube_processor.process_video(url, user.languages)
+            
+            if not video_title or not transcript:
+                # Generate error response
+                error_response = await self.ai_agent.generate_error_response(url, user.get_effective_model())
+                try:
+                    await processing_msg.edit_text(error_response)
+                except TelegramAPIError as e:
+                    # Handled here so the caller does not generate a second error response
+                    logger.warning(f"Failed to send error response to user {user.user_id}: {e}")
+                    await processing_msg.edit_text(_PROCESSING_ERROR_TEXT, parse_mode=None)
+                return False
+            
+            # Generate the summary, showing it in the processing message while it is written
+            summary = self.summarizer.summarize_stream(
+                text=transcript,
+                title=video_title,
+                model=model,
+                video_id=video_id,
+                languages=user.languages
+            )
+            if not await self._stream_summary(processing_msg, summary, footer):
+                await processing_msg.edit_text("❌ Не удалось создать анализ видео.", parse_mode=None)
+                return False
+        
+        return True
 
-    async def handle_unknown_message(self, message: Message):
+    async def _stream_reply(self, message: Message, pieces: AsyncIterator[str]):
+        """
+        Reply with text that is still being generated, editing the reply as
+        more arrives. Edits are coalesced to one per STREAM_EDIT_INTERVAL and
+        sent as plain text, since partial Markdown may not parse; the final
+        text uses the bot's Markdown parse mode.
+        
+        Args:
+            message: Telegram message to reply to
+            pieces: Pieces of the reply in order
+        """
+        loop = asyncio.get_running_loop()
+        sent = None
+        shown = ""
+        parts = []
+        # Start the clock now so a reply that arrives at once is sent only once
+        last_edit = loop.time()
+        
+        async for piece in pieces:
+            parts.append(piece)
+            if loop.time() - last_edit < STREAM_EDIT_INTERVAL:
+                continue
+            text = "".join(parts).strip()
+            if not text or text == shown:
+                continue
+            if sent is None:
+                sent = await message.answer(text, parse_mode=None)
+            else:
+                await sent.edit_text(text, parse_mode=None)
+            shown, last_edit = text, loop.time()
+        
+        text = "".join(parts).strip()
+        if not text:
+            raise ValueError("Empty reply")
+        
+        try:
+            if sent is None:
+                await message.answer(text)
+            else:
+                await sent.edit_text(text)
+        except TelegramBadRequest:
+            # Markdown did not parse: fall back to the plain text version
+            if sent is None:
+                await message.answer(text, parse_mode=None)
+            elif text != shown:
+                await sent.edit_text(text, parse_mode=None)
+    
+    async def _stream_summary(self, processing_msg: Message, pieces: AsyncIterator[str], footer: str) -> bool:
+        """
+        Show a summary in place of a placeholder message while it is being
+        generated. Edits are coalesced to one per STREAM_EDIT_INTERVAL and
+        shown as plain text; once the text outgrows a message, the finished
+        head is sent with Markdown and the rest continues in a new message.
+        
+        Args:
+            processing_msg: Placeholder message to replace
+            pieces: Pieces of the summary in order
+            footer: Text appended after the summary
+            
+        Returns:
+            bool: False if the summary came out empty
+        """
+        loop = asyncio.get_running_loop()
+        chat_id = processing_msg.chat.id
+        limit = MAX_MESSAGE_LENGTH - _MD_RESERVE
+        current = processing_msg
+        # Markdown markers left open by already finished messages
+        opened = ()
+        parts = []
+        shown = ""
+        last_edit = loop.time()
+        
+        async for piece in pieces:
+            parts.append(piece)
+            if loop.time() - last_edit < STREAM_EDIT_INTERVAL:
+                continue
+            text = "".join(parts)
+            head, tail = _cut_message(text, limit)
+            
+            if tail:
+                # The head is finished: format it with Markdown and keep streaming the
+                # tail in a new message. The head's message already exists, so the
+                # edit and the send are independent and run concurrently
+                still_open = _open_markdown(head, opened)
+                finished = _reopen_markdown(opened) + head + "".join(reversed(still_open))
+                _, current = await asyncio.gather(
+                    self._send_parts(current, (finished,)),
+                    self._send_new(processing_msg, tail)
+                )
+                opened = still_open
+                parts, shown = [tail], tail
+            elif text.strip() and text != shown:
+                await self._rate_limiter.wait(chat_id)
+                await current.edit_text(text, parse_mode=None, disable_web_page_preview=True)
+                shown = text
+            last_edit = loop.time()
+        
+        text = "".join(parts).strip()
+        if not text and current is processing_msg:
+            return False
+        
+        # Replace the streamed text with its formatted version, split to fit Telegram's limit
+        await self._send_parts(current, split_message(f"{_reopen_markdown(opened)}{text}\n\n{footer}"))
+        return True
+    
+    async def _send_new(self, message: Message, text: str) -> Message:
+        """
+        Send plain text to the chat of a message, paced by the rate limiter.
+        
+        Args:
+            message: Message whose chat to send to
+            text: Text to send
+            
+        Returns:
+            Message: The sent message
+        """
+        await self._rate_limiter.wait(message.chat.id)
+        async with self._send_semaphore:
+            return await message.answer(text, parse_mode=None, disable_web_page_preview=True)
+    
+    async def _send_parts(self, processing_msg: Message, parts: Iterable[str]):
+        """
+        Replace a placeholder message with the first part of a reply and send
+        the remaining parts after it. Editing the placeholder and sending the
+        second part are independent, so they run concurrently; later parts are
+        sent one by one since Telegram does not order concurrent sends.
+        
+        Args:
+            processing_msg: Placeholder message to replace
+            parts: Message texts in order (at least one)
+        """
+        chat_id = processing_msg.chat.id
+        
+        async def edit(text: str):
+            await self._rate_limiter.wait(chat_id)
+            async with self._send_semaphore:
+                try:
+                    await processing_msg.edit_text(text, disable_web_page_preview=True)
+                except TelegramBadRequest:
+                    # Markdown did not parse: fall back to plain text
+                    await processing_msg.edit_text(text, parse_mode=None, disable_web_page_preview=True)
+        
+        async def send(text: str):
+            await self._rate_limiter.wait(chat_id)
+            async with self._send_semaphore:
+                try:
+                    await processing_msg.answer(text, disable_web_page_preview=True)
+                except TelegramBadRequest:
+                    # Markdown did not parse: fall back to plain text
+                    await processing_msg.answer(text, parse_mode=None, disable_web_page_preview=True)
+        
+        parts = iter(parts)
+        first, second = next(parts), next(parts, None)
+        await asyncio.gather(edit(first), *((send(second),) if second is not None else ()))
+        for part in parts:
+            await send(part)
+    
+    async def handle_unknown_message(self, message: Message, user: User):
         """
         Handle unknown messages (not YouTube links or commands).
         
         Args:
             message: Telegram message with unknown content
+            user: Sender, loaded by UserMiddleware
         """
-        user_id = message.from_user.id
-        user = self.user_manager.get_or_create_user(user_id=user_id)
+        user_id = user.user_id
         
         # Don't process if user doesn't have access
         if not user.has_access():
@@ -1187,16 +1835,41 @@ class TelegramBot:
         
         text = message.text or ""
         
-        logger.info(f"Unknown message from user {user.display_name} (ID: {user_id}): {text[:50]}...")
+        logger.opt(lazy=True).info(
+            "Unknown message from user {} (ID: {}): {}...",
+            lambda: user.display_name, lambda: user_id, lambda: text[:50]
+        )
+        
+        # Empty/tiny messages and unknown commands get a canned reply
+        stripped = text.strip()
+        if len(stripped) < 3 or stripped.startswith("/"):
+            keyboard = create_admin_keyboard() if user.is_admin else create_main_keyboard()
+            await message.answer(random.choice(_STATIC_REPLIES), reply_markup=keyboard, parse_mode=None)
+            return
+        
+        # The user is talking about YouTube but the link filter did not match
+        if _YT_TERM_RE.search(text):
+            # A fixed hint beats a generated reply
+            await message.answer(
+                "🔗 Отправьте ссылку на конкретное видео в одном из форматов:\n"
+                "• youtube.com/watch?v=...\n"
+                "• youtu.be/...\n"
+                "• youtube.com/shorts/...",
+                parse_mode=None
+            )
+            return
         
         try:
-            # Generate response using AI
-            response = await self.ai_agent.handle_unknown_message(text, user.get_effective_model())
-            await message.answer(response)
+            # Generate response using AI, showing it while it is being written
+            await self._stream_reply(
+                message,
+                self.ai_agent.handle_unknown_message_stream(text, user.get_effective_model())
+            )
             
         except Exception as e:
             logger.error(f"Error handling unknown message: {e}")
             await message.answer(
                 "🤖 Я умею анализировать только YouTube видео.\n\n"
-                "📎 Отправьте мне ссылку на YouTube видео, и я создам его краткий анализ!"
+                "📎 Отправьте мне ссылку на YouTube видео, и я создам его краткий анализ!",
+                parse_mode=None
             )
\ No newline at end of file
@@ -9,15 +9,13 @@ from loguru import logger
 # Path to custom prompts configuration file
 CUSTOM_PROMPTS_PATH = os.path.join("data", "config", "custom_prompts.json")
 
-# Prompt for video summarization
-SUMMARIZE_PROMPT = """
+# Prompts for video summarization.
+# The static instructions are sent as their own message ahead of the
+# per-video part so that every request shares an identical prefix
+# (lets the provider's prompt cache kick in).
+SUMMARIZE_PROMPT_STATIC = """
 Проанализируй транскрипцию видео и создай краткий, но информативный анализ для быстрого ознакомления.
 
-🎥 **{title}**
-
-Транскрипция: 
-{text}
-
 Создай структурированный анализ:
 
 ## 📋 КЛЮЧЕВЫЕ МОМЕНТЫ
@@ -43,14 +41,29 @@ SUMMARIZE_PROMPT = """
 - Фокусируйся на практической пользе для зрителя
 """
 
-# Prompt for combining summaries of multiple chunks
-COMBINE_SUMMARIES_PROMPT = """
-Объедини несколько частей анализа видео в единый краткий обзор.
+SUMMARIZE_PROMPT_DYNAMIC = """
+🎥 **{title}**
+
+Транскрипция: 
+{text}
+"""
 
+# Prompt for summarizing several chunks in one request (sent after SUMMARIZE_PROMPT_STATIC)
+SUMMARIZE_CHUNKS_BATCH_PROMPT = """
 🎥 **{title}**
 
-Части анализа:
-{summaries}
+Ниже {count} фрагментов транскрипции этого видео, разделённых строкой ###CHUNK###.
+Создай анализ для каждого фрагмента отдельно по инструкции выше.
+
+Верни JSON-объект вида {{"summaries": ["анализ фрагмента 1", "анализ фрагмента 2", ...]}}
+ровно с {count} элементами в исходном порядке.
+
+{chunks}
+"""
+
+# Prompts for combining summaries of multiple chunks (static + dynamic, as above)
+COMBINE_SUMMARIES_PROMPT_STATIC = """
+Объедини несколько частей анализа видео в единый краткий обзор.
 
 **ЗАДАЧА:** Создать единый анализ, который:
 1. **Устраняет дублирование** - убери повторяющиеся идеи
@@ -73,6 +86,13 @@ COMBINE_SUMMARIES_PROMPT = """
 - Сохраняй все ценные детали из исходных частей
 """
 
+COMBINE_SUMMARIES_PROMPT_DYNAMIC = """
+🎥 **{title}**
+
+Части анализа:
+{summaries}
+"""
+
 # Prompt for handling error responses
 ERROR_RESPONSE_PROMPT = """
 Пользователь отправил ссылку на YouTube видео: "{video_url}", но произошла ошибка при обработке.
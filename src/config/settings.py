@@ -12,6 +12,17 @@ load_dotenv()
 # Telegram Bot settings
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 
+# Update delivery: "polling" (default, good for development) or "webhook"
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+
+# Webhook settings (used only when BOT_MODE=webhook)
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # Public HTTPS base URL, e.g. https://bot.example.com
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None  # Checked against Telegram's secret token header
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "100"))
+
 # OpenAI API settings
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -35,6 +46,22 @@ MAX_MESSAGE_LENGTH = 4096
 # Model settings
 DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "gpt-4.1-nano")
 
+# Maximum number of concurrent OpenAI requests per AI agent (tune to your rate-limit tier)
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+
+# Maximum number of videos downloaded and summarized at the same time; the rest wait in line
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "4"))
+
+# Per-user limit on messages and button presses: sustained rate per second and burst size
+USER_RATE_LIMIT = float(os.getenv("USER_RATE_LIMIT", "1"))
+USER_RATE_BURST = float(os.getenv("USER_RATE_BURST", "10"))
+
+# Semantic cache: reuse a cached summary when a new input's embedding is
+# almost identical to a cached one (costs one cheap embedding call per miss)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
 # Default preferences
 DEFAULT_LANGUAGES = ['ru', 'en']
 
@@ -64,4 +91,20 @@ MODEL_CONTEXT_LIMITS = {
 }
 
 # Default context window if model not found in the above mapping
-DEFAULT_CONTEXT_WINDOW = 4000 
\ No newline at end of file
+DEFAULT_CONTEXT_WINDOW = 4000
+
+# Maximum completion size per model (in tokens), same prefix rules as above
+MODEL_OUTPUT_LIMITS = {
+    "gpt-4.1-nano": 32768,
+    "gpt-4.1-preview": 32768,
+    "gpt-4-32k": 4096,
+    "gpt-4-turbo": 4096,
+    "gpt-4o-mini": 16384,
+    "gpt-4o": 16384,
+    "gpt-3.5-turbo-16k": 4096,
+    "gpt-4": 4096,
+    "gpt-3.5-turbo": 4096
+}
+
+# Default completion limit if model not found in the above mapping
+DEFAULT_OUTPUT_LIMIT = 4096 
\ No newline at end of file
@@ -5,7 +5,9 @@ Handles user data storage and retrieval using SQLite database.
 import sqlite3
 import json
 import os
-from typing import Dict, List, Optional, Any
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Any, Tuple
 from datetime import datetime
 from src.models.user import User
 from src.config.settings import ADMIN_USER_ID
@@ -17,24 +19,29 @@ class UserDatabaseManager:
     Handles persistence, retrieval, and operations on user data.
     """
     
-    def __init__(self, db_path: str = "data/users.db", logger: Optional[logging.Logger] = None):
+    def __init__(self, db_path: str = "data/users.db", logger: Optional[logging.Logger] = None,
+                 cache_size: int = 10000):
         """
         Initializes the UserDatabaseManager.
         
         Args:
             db_path: Path to the SQLite database file
             logger: Logger instance
+            cache_size: Maximum number of users kept in memory
         """
         self.db_path = db_path
         self.logger = logger or logging.getLogger(__name__)
-        self.users: Dict[int, User] = {}
+        # Bounded LRU of recently used users; the database is the source of truth
+        self.users: "OrderedDict[int, User]" = OrderedDict()
+        self.cache_size = cache_size
+        # Methods may run in worker threads (the bot offloads them with asyncio.to_thread)
+        self._lock = threading.RLock()
         
         # Create data directory if it doesn't exist
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         
         # Initialize database
         self._init_database()
-        self._load_users()
         self._ensure_admin()
     
     def _init_database(self) -> None:
@@ -68,47 +75,62 @@ class UserDatabaseManager:
             self.logger.error(f"Error initializing database: {e}")
             raise
     
-    def _load_users(self) -> None:
-        """Load all users from database into memory"""
+    @staticmethod
+    def _row_to_user(row: sqlite3.Row) -> User:
+        """Builds a User from a database row"""
+        user_data = dict(row)
+        
+        # Parse JSON languages
+        user_data['languages'] = json.loads(user_data['languages']) if user_data['languages'] else ['ru', 'en']
+        
+        # Parse datetime strings
+        if user_data['created_at']:
+            user_data['created_at'] = datetime.fromisoformat(user_data['created_at'])
+        else:
+            user_data['created_at'] = datetime.now()
+        
+        if user_data['updated_at']:
+            user_data['updated_at'] = datetime.fromisoformat(user_data['updated_at'])
+        else:
+            user_data['updated_at'] = datetime.now()
+        
+        # Convert boolean fields
+        user_data['is_admin'] = bool(user_data['is_admin'])
+        user_data['is_approved'] = bool(user_data['is_approved'])
+        user_data['is_model_locked'] = bool(user_data['is_model_locked'])
+        
+        return User(**user_data)
+    
+    def _fetch_users(self, where: str = "", params: tuple = ()) -> List[User]:
+        """
+        Loads users from the database, preferring already cached instances
+        so callers always share one object per user.
+        
+        Args:
+            where: Optional SQL WHERE clause
+            params: Parameters for the WHERE clause
+        
+        Raises:
+            sqlite3.Error: If the database cannot be read; a failed read must
+                never be mistaken for "no such user"
+        """
         try:
             with sqlite3.connect(self.db_path) as conn:
                 conn.row_factory = sqlite3.Row  # Enable column access by name
-                cursor = conn.cursor()
-                
-                cursor.execute('SELECT * FROM users')
-                rows = cursor.fetchall()
-                
-                users_loaded = 0
-                for row in rows:
-                    user_data = dict(row)
-                    
-                    # Parse JSON languages
-                    user_data['languages'] = json.loads(user_data['languages']) if user_data['languages'] else ['ru', 'en']
-                    
-                    # Parse datetime strings
-                    if user_data['created_at']:
-                        user_data['created_at'] = datetime.fromisoformat(user_data['created_at'])
-                    else:
-                        user_data['created_at'] = datetime.now()
-                    
-                    if user_data['updated_at']:
-                        user_data['updated_at'] = datetime.fromisoformat(user_data['updated_at'])
-                    else:
-                        user_data['updated_at'] = datetime.now()
-                    
-                    # Convert boolean fields
-                    user_data['is_admin'] = bool(user_data['is_admin'])
-                    user_data['is_approved'] = bool(user_data['is_approved'])
-                    user_data['is_model_locked'] = bool(user_data['is_model_locked'])
-                    
-                    user = User(**user_data)
-                    self.users[user.user_id] = user
-                    users_loaded += 1
-                
-                self.logger.info(f"Loaded {users_loaded} users from database")
-                
-        except Exception as e:
+                rows = conn.execute(f'SELECT * FROM users {where}', params).fetchall()
+        except sqlite3.Error as e:
             self.logger.error(f"Error loading users from database: {e}")
+            raise
+        
+        return [self.users.get(row['user_id']) or self._row_to_user(row) for row in rows]
+    
+    def _remember(self, user: User) -> None:
+        """Puts a user into the in-memory LRU, evicting the oldest entry when full"""
+        with self._lock:
+            self.users[user.user_id] = user
+            self.users.move_to_end(user.user_id)
+            if len(self.users) > self.cache_size:
+                self.users.popitem(last=False)
     
     def _ensure_admin(self) -> None:
         """Ensures the admin user exists"""
@@ -131,68 +153,130 @@ class UserDatabaseManager:
                 self.save_user(admin)
                 self.logger.info(f"Created admin user with ID {ADMIN_USER_ID}")
     
+    def get_cached_user(self, user_id: int) -> Optional[User]:
+        """Gets a user from the in-memory LRU only, without touching the database"""
+        with self._lock:
+            user = self.users.get(user_id)
+            if user is not None:
+                self.users.move_to_end(user_id)
+            return user
+    
     def get_user(self, user_id: int) -> Optional[User]:
-        """Gets a user by their ID"""
-        return self.users.get(user_id)
+        """Gets a user by their ID; None means the user does not exist, database errors propagate"""
+        user = self.get_cached_user(user_id)
+        if user is not None:
+            return user
+        
+        users = self._fetch_users('WHERE user_id = ?', (user_id,))
+        if not users:
+            return None
+        self._remember(users[0])
+        return users[0]
     
     def get_or_create_user(self, user_id: int, **kwargs: Any) -> User:
         """Gets a user by their ID or creates a new one if it doesn't exist"""
-        user = self.get_user(user_id)
-        if not user:
-            user = User(user_id=user_id, **kwargs)
-            
-            # If this is the admin user, grant admin privileges
-            if user_id == ADMIN_USER_ID:
-                user.is_admin = True
-                user.is_approved = True
-            
-            self.users[user_id] = user
-            self.save_user(user)
-            self.logger.info(f"Created new user with ID {user_id}")
-        return user
+        # Locked so two concurrent first messages from a user create it only once.
+        # A failed lookup raises instead of returning None, so an existing user is
+        # never replaced by a default one through INSERT OR REPLACE
+        with self._lock:
+            user = self.get_user(user_id)
+            if not user:
+                user = User(user_id=user_id, **kwargs)
+                
+                # If this is the admin user, grant admin privileges
+                if user_id == ADMIN_USER_ID:
+                    user.is_admin = True
+                    user.is_approved = True
+                
+                self.save_user(user)
+                self.logger.info(f"Created new user with ID {user_id}")
+            return user
+    
+    @staticmethod
+    def _user_to_row(user: User) -> tuple:
+        """Builds the database row values for a user"""
+        return (
+            user.user_id,
+            user.username,
+            user.first_name,
+            user.last_name,
+            user.is_admin,
+            user.is_approved,
+            user.model,
+            user.forced_model,
+            user.is_model_locked,
+            json.dumps(user.languages),
+            user.remaining_requests,
+            user.created_at.isoformat(),
+            user.updated_at.isoformat()
+        )
     
     def save_user(self, user: User) -> None:
         """Saves a user to the database"""
+        self.save_users([user])
+    
+    def save_users(self, users: List[User]) -> None:
+        """Saves several users to the database in a single transaction"""
         try:
             with sqlite3.connect(self.db_path) as conn:
                 cursor = conn.cursor()
                 
-                cursor.execute('''
+                cursor.executemany('''
                     INSERT OR REPLACE INTO users (
                         user_id, username, first_name, last_name, is_admin, is_approved,
                         model, forced_model, is_model_locked, languages, remaining_requests,
                         created_at, updated_at
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    user.user_id,
-                    user.username,
-                    user.first_name,
-                    user.last_name,
-                    user.is_admin,
-                    user.is_approved,
-                    user.model,
-                    user.forced_model,
-                    user.is_model_locked,
-                    json.dumps(user.languages),
-                    user.remaining_requests,
-                    user.created_at.isoformat(),
-                    user.updated_at.isoformat()
-                ))
+                ''', [self._user_to_row(user) for user in users])
                 
                 conn.commit()
-                self.users[user.user_id] = user
+                for user in users:
+                    self._remember(user)
                 
         except Exception as e:
-            self.logger.error(f"Error saving user {user.user_id}: {e}")
+            self.logger.error(f"Error saving users {[user.user_id for user in users]}: {e}")
             raise
     
     def get_all_users(self) -> List[User]:
-        """Returns a list of all users"""
-        return list(self.users.values())
+        """Returns a list of all users (empty if the database cannot be read)"""
+        try:
+            return self._fetch_users()
+        except sqlite3.Error:
+            return []
+    
+    def get_users_page(self, offset: int, limit: int, exclude_id: Optional[int] = None) -> Tuple[List[User], int]:
+        """
+        Returns one page of users ordered by ID, letting SQLite do the slicing.
+        
+        Args:
+            offset: Number of users to skip
+            limit: Maximum number of users to return
+            exclude_id: User to leave out (e.g. the admin viewing the list)
+        
+        Returns:
+            Tuple[List[User], int]: Users on the page and the total number of matching users
+        """
+        where, params = ('WHERE user_id != ?', (exclude_id,)) if exclude_id is not None else ('', ())
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.row_factory = sqlite3.Row  # Enable column access by name
+                total = conn.execute(f'SELECT COUNT(*) FROM users {where}', params).fetchone()[0]
+                rows = conn.execute(
+                    f'SELECT * FROM users {where} ORDER BY user_id LIMIT ? OFFSET ?',
+                    params + (limit, offset)
+                ).fetchall()
+        except Exception as e:
+            self.logger.error(f"Error loading users page from database: {e}")
+            return [], 0
+        
+        return [self.users.get(row['user_id']) or self._row_to_user(row) for row in rows], total
     
     def get_admin_users(self) -> List[User]:
-        """Returns a list of admin users"""
-        return [user for user in self.users.values() if user.is_admin]
+        """Returns a list of admin users (empty if the database cannot be read)"""
+        try:
+            return self._fetch_users('WHERE is_admin = 1')
+        except sqlite3.Error:
+            return []
     
     def request_access(self, user: User) -> None:
         """Marks a user as requesting access"""
@@ -4,26 +4,58 @@ Handles text summarization using OpenAI API.
 """
 import re
 import time
-from typing import List, Optional
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
 from loguru import logger
 from src.ai_agent import AIAgent
 from src.config.settings import (
     DEFAULT_CHUNK_SIZE, 
-    LARGE_CONTEXT_CHUNK_SIZE, 
     DEFAULT_MODEL,
-    MODEL_CONTEXT_LIMITS,
-    DEFAULT_CONTEXT_WINDOW
+    MODEL_CONTEXT_LIMITS
 )
 
+# Sentence endings (., !, ?) followed by whitespace
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+def pack_pieces(pieces: Iterable[str], limit: int, separator: str) -> List[str]:
+    """
+    Greedily joins pieces into chunks of at most `limit` characters.
+    Pieces are collected in a list and joined once per chunk, so the total
+    cost is linear in the text length. A piece longer than `limit` becomes
+    a chunk of its own for the caller to split further.
+    
+    Args:
+        pieces: Text pieces in order (paragraphs, sentences, words)
+        limit: Maximum chunk length
+        separator: String placed between pieces
+        
+    Returns:
+        List[str]: Chunks of joined pieces
+    """
+    chunks = []
+    buffer: List[str] = []
+    buffer_len = 0
+    for piece in pieces:
+        if buffer and buffer_len + len(separator) + len(piece) > limit:
+            chunks.append(separator.join(buffer))
+            buffer, buffer_len = [], 0
+        buffer_len += len(piece) + (len(separator) if buffer else 0)
+        buffer.append(piece)
+    if buffer:
+        chunks.append(separator.join(buffer))
+    return chunks
+
 class Summarizer:
     """
     Handles text summarization using OpenAI API through AI agent.
     """
-    def __init__(self):
+    def __init__(self, ai_agent: Optional[AIAgent] = None):
         """
         Initializes the summarizer with the AI agent.
+        
+        Args:
+            ai_agent: Agent to share with the caller (a new one is created if None)
         """
-        self.ai_agent = AIAgent()
+        self.ai_agent = ai_agent or AIAgent()
         self.model = DEFAULT_MODEL
         self.chunk_size = self.get_optimal_chunk_size(self.model)
         logger.info(f"Summarizer initialized with default model: {self.model}, chunk size: {self.chunk_size}")
@@ -112,75 +144,27 @@ class Summarizer:
         if len(text) <= chunk_size:
             return [text]
         
-        # Split by paragraph boundaries first
-        paragraphs = text.split("\n\n")
-        chunks = []
-        current_chunk = ""
-        
-        # Group paragraphs into chunks
-        for paragraph in paragraphs:
-            paragraph = paragraph.strip()
-            if not paragraph:
-                continue
-                
-            # If adding this paragraph would exceed chunk size, start a new chunk
-            if len(current_chunk) + len(paragraph) + 4 > chunk_size and current_chunk:  # +4 for "\n\n"
-                chunks.append(current_chunk)
-                current_chunk = paragraph
-            else:
-                if current_chunk:
-                    current_chunk += "\n\n" + paragraph
-                else:
-                    current_chunk = paragraph
-        
-        # Add the last chunk if not empty
-        if current_chunk:
-            chunks.append(current_chunk)
-        
-        # Handle case where a single paragraph is too long for a chunk
+        # Group paragraphs into chunks; an oversized paragraph is split by
+        # sentence boundaries, and an oversized sentence by words
+        paragraphs = [p for p in (paragraph.strip() for paragraph in text.split("\n\n")) if p]
         final_chunks = []
-        for chunk in chunks:
+        for chunk in pack_pieces(paragraphs, chunk_size, "\n\n"):
             if len(chunk) <= chunk_size:
                 final_chunks.append(chunk)
-            else:
-                # Split long paragraphs by sentence boundaries
-                sentences = re.split(r'(?<=[.!?])\s+', chunk)
-                sub_chunk = ""
-                
-                for sentence in sentences:
-                    if len(sub_chunk) + len(sentence) + 2 <= chunk_size and sub_chunk:  # +2 for space
-                        sub_chunk += " " + sentence
-                    elif len(sub_chunk) + len(sentence) <= chunk_size:
-                        sub_chunk += sentence
-                    else:
-                        if sub_chunk:
-                            final_chunks.append(sub_chunk)
-                        
-                        # If the sentence itself is too long, split it
-                        if len(sentence) > chunk_size:
-                            # Split by words
-                            words = sentence.split()
-                            sub_chunk = ""
-                            
-                            for word in words:
-                                if len(sub_chunk) + len(word) + 1 <= chunk_size and sub_chunk:  # +1 for space
-                                    sub_chunk += " " + word
-                                elif len(sub_chunk) + len(word) <= chunk_size:
-                                    sub_chunk += word
-                                else:
-                                    if sub_chunk:
-                                        final_chunks.append(sub_chunk)
-                                    sub_chunk = word
-                            
-                            if sub_chunk:
-                                sub_chunk = sub_chunk
-                        else:
-                            sub_chunk = sentence
-                
-                if sub_chunk:
+                continue
+            
+            for sub_chunk in pack_pieces(_SENTENCE_SPLIT_RE.split(chunk), chunk_size, " "):
+                if len(sub_chunk) <= chunk_size:
                     final_chunks.append(sub_chunk)
+                else:
+                    final_chunks.extend(pack_pieces(sub_chunk.split(), chunk_size, " "))
         
-        logger.info(f"Split text into {len(final_chunks)} chunks (average chunk size: {sum(len(c) for c in final_chunks) // len(final_chunks)} chars)")
+        # Lazy: the average walks every chunk, so only compute it when INFO is enabled
+        logger.opt(lazy=True).info(
+            "Split text into {} chunks (average chunk size: {} chars)",
+            lambda: len(final_chunks),
+            lambda: sum(len(c) for c in final_chunks) // len(final_chunks)
+        )
         return final_chunks
     
     async def summarize(self, text: str, title: str = "", model: Optional[str] = None) -> str:
@@ -213,7 +197,7 @@ class Summarizer:
         # If text is too long for a single request, split it
         if len(text) > chunk_size:
             logger.info(f"Text exceeds {chunk_size} characters, splitting into chunks")
-            result = await self._split_and_summarize(text, title, model_to_use, chunk_size)
+            result, _ = await self._split_and_summarize(text, title, model_to_use, chunk_size)
         else:
             result = await self.ai_agent.summarize_text(text, title, model_to_use)
         
@@ -223,7 +207,49 @@ class Summarizer:
         
         return result
     
-    async def _split_and_summarize(self, text: str, title: str, model: str, chunk_size: int) -> str:
+    async def summarize_stream(self, text: str, title: str = "", model: Optional[str] = None,
+                               video_id: Optional[str] = None,
+                               languages: Optional[List[str]] = None) -> AsyncIterator[str]:
+        """
+        Summarizes text like summarize(), yielding the summary while it is
+        being generated. Texts that need chunking are summarized chunk by
+        chunk first, so their combined summary arrives as a single piece.
+        
+        Args:
+            text: Text to summarize
+            title: Content title
+            model: Model to use (falls back to default if not specified)
+            video_id: Video the text is the transcript of; its complete
+                summary is cached per video, model and languages
+            languages: Transcript languages the text was fetched with
+            
+        Yields:
+            str: Pieces of the summary in order
+        """
+        if not text:
+            logger.error("Received empty text for summarization")
+            yield "Не удалось создать суммаризацию из-за пустого текста."
+            return
+        
+        model_to_use = model or self.model
+        chunk_size = self.get_optimal_chunk_size(model_to_use)
+        
+        if len(text) > chunk_size:
+            logger.info(f"Text exceeds {chunk_size} characters, splitting into chunks")
+            summary, complete = await self._split_and_summarize(text, title, model_to_use, chunk_size)
+            yield summary
+        else:
+            parts = []
+            async for piece in self.ai_agent.summarize_text_stream(text, title, model_to_use):
+                parts.append(piece)
+                yield piece
+            summary, complete = "".join(parts).strip(), True
+        
+        # Summaries with failed chunks are not cached, so the next request retries them
+        if video_id and complete and summary:
+            await self.ai_agent.cache_video_summary(video_id, model_to_use, languages or [], summary)
+    
+    async def _split_and_summarize(self, text: str, title: str, model: str, chunk_size: int) -> Tuple[str, bool]:
         """
         Splits text into chunks, summarizes each chunk, and combines the summaries.
         
@@ -234,38 +260,43 @@ class Summarizer:
             chunk_size: Maximum chunk size
             
         Returns:
-            str: Combined summary
+            Tuple[str, bool]: Combined summary, and whether every chunk was summarized
         """
         # Split text into chunks
         chunks = self.split_text_into_chunks(text, chunk_size)
         logger.info(f"Split text into {len(chunks)} chunks for processing")
         
-        # Summarize each chunk
+        # Summarize several chunks in one request (it falls back to concurrent
+        # per-chunk requests when they do not fit or the response is unusable)
+        # Don't add "part X of Y" to the title for chunk summarization 
+        # This avoids confusing the AI and keeps it from adding this reference in the final output
+        if len(chunks) > 1:
+            results = await self.ai_agent.summarize_chunks_batched(chunks, title, model, return_exceptions=True)
+        else:
+            results = await self.ai_agent.summarize_chunks(chunks, title, model, return_exceptions=True)
+        
         summaries = []
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Summarizing chunk {i+1}/{len(chunks)} with length {len(chunk)}")
-            
-            try:
-                # Don't add "part X of Y" to the title for chunk summarization 
-                # This avoids confusing the AI and keeps it from adding this reference in the final output
-                chunk_summary = await self.ai_agent.summarize_text(chunk, title, model)
-                summaries.append(chunk_summary)
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                logger.error(f"Error summarizing chunk {i+1}: {str(result)}")
+                summaries.append(f"Ошибка при обработке части {i+1}: {str(result)}")
+            else:
+                summaries.append(result)
                 logger.info(f"Completed summary for chunk {i+1}/{len(chunks)}")
-            except Exception as e:
-                logger.error(f"Error summarizing chunk {i+1}: {str(e)}")
-                summaries.append(f"Ошибка при обработке части {i+1}: {str(e)}")
+        
+        complete = not any(isinstance(result, Exception) for result in results)
         
         # If only one chunk was processed, return its summary
         if len(summaries) == 1:
-            return summaries[0]
+            return summaries[0], complete
         
         # Otherwise, combine the summaries
         logger.info(f"Combining {len(summaries)} chunk summaries")
         try:
             combined_summary = await self.ai_agent.combine_summaries(summaries, title, model)
-            return combined_summary
+            return combined_summary, complete
         except Exception as e:
             logger.error(f"Error combining summaries: {str(e)}")
             # Fallback: join summaries with headers (without part references)
             fallback = "\n\n".join([f"## Раздел {i+1}\n\n{summary}" for i, summary in enumerate(summaries)])
-            return fallback 
\ No newline at end of file
+            return fallback, False 
\ No newline at end of file
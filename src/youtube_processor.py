@@ -5,12 +5,23 @@ Handles fetching transcripts and metadata from YouTube videos.
 import re
 import aiohttp
 from pathlib import Path
-from typing import List, Optional, Tuple
-from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
+from typing import List, Optional
+from youtube_transcript_api import YouTubeTranscriptApi
 from loguru import logger
 import asyncio
 import xml.etree.ElementTree as ET
 
+# Regular expressions for extracting video ID from different URL formats
+_VIDEO_ID_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/watch\?v=([^&\s]+)',
+    r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/embed\/([^\?\s]+)',
+    r'(?:https?:\/\/)?(?:www\.)?youtu\.be\/([^\?\s]+)',
+    r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/shorts\/([^\?\s]+)'
+))
+
+# Sentence endings (., !, ?) followed by space or newline
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
 class YouTubeProcessor:
     """
     Handles fetching and processing YouTube video transcripts.
@@ -25,8 +36,33 @@ class YouTubeProcessor:
         self.temp_dir = temp_dir
         # Create temp directory if it doesn't exist
         Path(temp_dir).mkdir(exist_ok=True)
+        # One transcript client for all requests, so its HTTP session keeps
+        # connections to YouTube alive between videos
+        self.ytt_api = YouTubeTranscriptApi()
+        # Shared aiohttp session, created on first request inside the running loop
+        self._session: Optional[aiohttp.ClientSession] = None
         logger.info(f"YouTubeProcessor initialized, temp directory: {temp_dir}")
     
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the shared HTTP session, creating it on first use. Reusing it
+        keeps connections alive and DNS cached between requests, instead of a
+        new connection and TLS handshake per video.
+        
+        Returns:
+            aiohttp.ClientSession: Shared session
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300, keepalive_timeout=60)
+            )
+        return self._session
+    
+    async def close(self) -> None:
+        """Closes the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
     async def extract_video_id(self, url: str) -> str:
         """
         Extracts the video ID from a YouTube URL.
@@ -40,16 +76,8 @@ class YouTubeProcessor:
         Raises:
             ValueError: If the video ID cannot be extracted
         """
-        # Regular expressions for extracting video ID from different URL formats
-        youtube_regex = [
-            r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/watch\?v=([^&\s]+)',
-            r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/embed\/([^\?\s]+)',
-            r'(?:https?:\/\/)?(?:www\.)?youtu\.be\/([^\?\s]+)',
-            r'(?:https?:\/\/)?(?:www\.)?youtube\.com\/shorts\/([^\?\s]+)'
-        ]
-        
-        for pattern in youtube_regex:
-            match = re.search(pattern, url)
+        for pattern in _VIDEO_ID_PATTERNS:
+            match = pattern.search(url)
             if match:
                 return match.group(1)
         
@@ -70,23 +98,22 @@ class YouTubeProcessor:
             # Get video info through YouTube oEmbed API
             api_url = f"https://www.youtube.com/oembed?url=http://www.youtube.com/watch?v={video_id}&format=json"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(api_url) as response:
-                    if response.status == 200:
-                        video_info = await response.json()
-                        title = video_info.get('title', f"Video {video_id}")
-                        author = video_info.get('author_name', 'Unknown creator')
-                        logger.info(f"Got video info: '{title}' by {author} (ID: {video_id})")
-                        return {
-                            'title': title,
-                            'author_name': author
-                        }
-                    else:
-                        logger.warning(f"Failed to get video info, status: {response.status}")
-                        return {
-                            'title': f"Video {video_id}",
-                            'author_name': 'Unknown creator'
-                        }
+            async with self._get_session().get(api_url) as response:
+                if response.status == 200:
+                    video_info = await response.json()
+                    title = video_info.get('title', f"Video {video_id}")
+                    author = video_info.get('author_name', 'Unknown creator')
+                    logger.info(f"Got video info: '{title}' by {author} (ID: {video_id})")
+                    return {
+                        'title': title,
+                        'author_name': author
+                    }
+                else:
+                    logger.warning(f"Failed to get video info, status: {response.status}")
+                    return {
+                        'title': f"Video {video_id}",
+                        'author_name': 'Unknown creator'
+                    }
                 
         except Exception as e:
             logger.warning(f"Error getting video info: {str(e)}")
@@ -148,15 +175,14 @@ class YouTubeProcessor:
             
         logger.info(f"Getting subtitles for video ID: {video_id}, preferred languages: {languages}")
         
-        loop = asyncio.get_event_loop()
-        ytt_api = YouTubeTranscriptApi()
+        # The transcript API is blocking, so network calls run in worker threads;
+        # lookups in an already fetched transcript list stay on the event loop
+        ytt_api = self.ytt_api
         
         # Method 1: Try direct fetch API with preferred languages
         try:
             logger.debug("Trying direct fetch API")
-            transcript = await loop.run_in_executor(
-                None, lambda: ytt_api.fetch(video_id, languages=languages)
-            )
+            transcript = await asyncio.to_thread(ytt_api.fetch, video_id, languages=languages)
             
             if transcript and len(transcript) > 0:
                 subtitle_text = self._construct_transcript_text(transcript.to_raw_data())
@@ -165,24 +191,20 @@ class YouTubeProcessor:
                     return subtitle_text
                     
         except Exception as e:
-            logger.debug(f"Direct fetch failed: {str(e)}")
+            logger.debug("Direct fetch failed: {}", e)
         
         # Method 2: Try with transcript list and find available
         try:
             logger.debug("Trying transcript list approach")
-            transcript_list = await loop.run_in_executor(
-                None, lambda: ytt_api.list(video_id)
-            )
+            transcript_list = await asyncio.to_thread(ytt_api.list, video_id)
             
             # Try each preferred language
             for lang in languages:
                 try:
-                    transcript_obj = await loop.run_in_executor(
-                        None, lambda: transcript_list.find_transcript([lang])
-                    )
+                    transcript_obj = transcript_list.find_transcript([lang])
                     
                     if transcript_obj:
-                        fetched_transcript = await loop.run_in_executor(None, transcript_obj.fetch)
+                        fetched_transcript = await asyncio.to_thread(transcript_obj.fetch)
                         if fetched_transcript and len(fetched_transcript) > 0:
                             subtitle_text = self._construct_transcript_text(fetched_transcript.to_raw_data())
                             if subtitle_text and len(subtitle_text.strip()) >= 10:
@@ -190,18 +212,16 @@ class YouTubeProcessor:
                                 return subtitle_text
                                 
                 except Exception as e:
-                    logger.debug(f"Transcript list failed for {lang}: {str(e)}")
+                    logger.debug("Transcript list failed for {}: {}", lang, e)
                     continue
             
             # Try auto-generated transcripts
             logger.debug("Trying auto-generated transcripts")
             try:
-                transcript_obj = await loop.run_in_executor(
-                    None, lambda: transcript_list.find_generated_transcript(languages)
-                )
+                transcript_obj = transcript_list.find_generated_transcript(languages)
                 
                 if transcript_obj:
-                    fetched_transcript = await loop.run_in_executor(None, transcript_obj.fetch)
+                    fetched_transcript = await asyncio.to_thread(transcript_obj.fetch)
                     if fetched_transcript and len(fetched_transcript) > 0:
                         subtitle_text = self._construct_transcript_text(fetched_transcript.to_raw_data())
                         if subtitle_text and len(subtitle_text.strip()) >= 10:
@@ -209,14 +229,14 @@ class YouTubeProcessor:
                             return subtitle_text
                             
             except Exception as e:
-                logger.debug(f"Auto-generated failed: {str(e)}")
+                logger.debug("Auto-generated failed: {}", e)
             
             # Try any available transcript
             logger.debug("Trying any available transcript")
             available_transcripts = list(transcript_list)
             for transcript_obj in available_transcripts:
                 try:
-                    fetched_transcript = await loop.run_in_executor(None, transcript_obj.fetch)
+                    fetched_transcript = await asyncio.to_thread(transcript_obj.fetch)
                     if fetched_transcript and len(fetched_transcript) > 0:
                         subtitle_text = self._construct_transcript_text(fetched_transcript.to_raw_data())
                         if subtitle_text and len(subtitle_text.strip()) >= 10:
@@ -224,20 +244,18 @@ class YouTubeProcessor:
                             return subtitle_text
                             
                 except Exception as e:
-                    logger.debug(f"Available transcript failed ({transcript_obj.language_code}): {str(e)}")
+                    logger.debug("Available transcript failed ({}): {}", transcript_obj.language_code, e)
                     continue
                     
         except Exception as e:
-            logger.debug(f"Transcript list approach failed: {str(e)}")
+            logger.debug("Transcript list approach failed: {}", e)
         
         # Method 3: Try each language separately
         logger.debug("Trying each language separately")
         for lang in languages:
             try:
-                logger.debug(f"Trying language: {lang}")
-                transcript = await loop.run_in_executor(
-                    None, lambda: ytt_api.fetch(video_id, languages=[lang])
-                )
+                logger.debug("Trying language: {}", lang)
+                transcript = await asyncio.to_thread(ytt_api.fetch, video_id, languages=[lang])
                 
                 if transcript and len(transcript) > 0:
                     subtitle_text = self._construct_transcript_text(transcript.to_raw_data())
@@ -246,16 +264,16 @@ class YouTubeProcessor:
                         return subtitle_text
                         
             except Exception as e:
-                logger.debug(f"Single language failed for {lang}: {str(e)}")
+                logger.debug("Single language failed for {}: {}", lang, e)
                 continue
         
         # Method 4: Try with preserve formatting
         logger.debug("Trying with preserve formatting")
         for lang in languages:
             try:
-                logger.debug(f"Trying with formatting for language: {lang}")
-                transcript = await loop.run_in_executor(
-                    None, lambda: ytt_api.fetch(video_id, languages=[lang], preserve_formatting=True)
+                logger.debug("Trying with formatting for language: {}", lang)
+                transcript = await asyncio.to_thread(
+                    ytt_api.fetch, video_id, languages=[lang], preserve_formatting=True
                 )
                 
                 if transcript and len(transcript) > 0:
@@ -265,7 +283,7 @@ class YouTubeProcessor:
                         return subtitle_text
                         
             except Exception as e:
-                logger.debug(f"With formatting failed for {lang}: {str(e)}")
+                logger.debug("With formatting failed for {}: {}", lang, e)
                 continue
         
         # All methods failed
@@ -332,8 +350,7 @@ class YouTubeProcessor:
             return [text]
         
         # Split text into sentences
-        # This regex looks for sentence endings (., !, ?) followed by space or newline
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         
         chunks = []
         current_chunk = ""
@@ -402,21 +419,21 @@ class YouTubeProcessor:
             return None, None
         
         try:
-            # Get video title
-            video_info = await self.get_video_info(video_id)
+            # Fetch the title and the transcript concurrently; they are independent
+            # network round-trips (get_video_info never raises, it falls back to a placeholder)
+            logger.info("Trying standard YouTube API for subtitles...")
+            video_info, transcript = await asyncio.gather(
+                self.get_video_info(video_id),
+                self.get_subtitles(video_id, languages),
+                return_exceptions=True
+            )
             video_title = video_info['title']
             
-            # Try to get video transcript - FIRST try standard API
-            transcript = None
-            
-            try:
-                logger.info("Trying standard YouTube API for subtitles...")
-                transcript = await self.get_subtitles(video_id, languages)
-                if transcript and len(transcript.strip()) >= 10:
-                    logger.info(f"Standard API successful: {len(transcript)} characters")
-                    return video_title, transcript
-            except Exception as api_error:
-                logger.warning(f"Standard API failed: {str(api_error)}")
+            if isinstance(transcript, Exception):
+                logger.warning(f"Standard API failed: {str(transcript)}")
+            elif transcript and len(transcript.strip()) >= 10:
+                logger.info(f"Standard API successful: {len(transcript)} characters")
+                return video_title, transcript
             
             # If standard API failed
             logger.warning("All subtitle extraction methods failed")